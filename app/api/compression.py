@@ -0,0 +1,315 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Callable, Dict, Iterable, Optional, Set
+import asyncio
+import gzip
+import zlib
+
+from app.core.config import settings
+from app.services.cache import LRUCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Media types worth compressing; images and archives are compressed already
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/x-ndjson", "application/problem+json", "application/javascript",
+    "application/xml", "image/svg+xml", "text/",
+)
+
+# Every coding the API can emit, whether or not its package is installed here
+KNOWN_ENCODINGS = ("zstd", "br", "gzip")
+
+# Bodies at least this large are compressed off the event loop
+THREAD_MIN_SIZE = 64 * 1024
+
+class _ZlibStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class Encoder:
+    """A content-coding: a one-shot compressor for whole bodies and a factory for streaming ones"""
+
+    def __init__(self, name: str, compress: Callable[[bytes], bytes], stream: Callable[[], object]):
+        self.name = name
+        self.compress = compress
+        self.stream = stream
+
+def available_encoders() -> Dict[str, Encoder]:
+    """Installed encoders in server preference order (zstd, br, gzip)"""
+    encoders = {}
+    if zstandard is not None:
+        level = settings.COMPRESSION_ZSTD_LEVEL
+        encoders["zstd"] = Encoder(
+            "zstd", lambda body: zstandard.ZstdCompressor(level=level).compress(body), lambda: _ZstdStream(level)
+        )
+    if brotli is not None:
+        quality = settings.COMPRESSION_BROTLI_QUALITY
+        encoders["br"] = Encoder(
+            "br", lambda body: brotli.compress(body, quality=quality), lambda: _BrotliStream(quality)
+        )
+    level = settings.COMPRESSION_GZIP_LEVEL
+    encoders["gzip"] = Encoder(
+        "gzip", lambda body: gzip.compress(body, compresslevel=level, mtime=0), lambda: _ZlibStream(level)
+    )
+    return encoders
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value"""
+    weights = {}
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+def negotiate_encoding(header: Optional[str], encoders: Iterable[str]) -> Optional[str]:
+    """Best acceptable coding; ties go to the earlier (preferred) encoder, None means identity"""
+    if not header:
+        return None
+    weights = parse_accept_encoding(header)
+    best, best_weight = None, 0.0
+    for name in encoders:
+        weight = weights.get(name, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = name, weight
+    return best
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of the encoded representation: the identity tag with a `-{encoding}` suffix"""
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else etag
+
+def strip_encoding_suffix(tag: str) -> str:
+    for encoding in KNOWN_ENCODINGS:
+        suffix = f'-{encoding}"'
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+def normalize_etags(header: str) -> str:
+    """Rewrite an If-None-Match/If-Match list to identity tags, which is what endpoints compare against"""
+    return ", ".join(strip_encoding_suffix(tag.strip()) for tag in header.split(","))
+
+def _opaque_tags(header: Optional[str]) -> Set[str]:
+    if not header:
+        return set()
+    return {tag.strip()[2:] if tag.strip().startswith("W/") else tag.strip() for tag in header.split(",")}
+
+def _add_vary(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if vary is None:
+        headers["vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["vary"] = f"{vary}, Accept-Encoding"
+
+def _is_compressible(status: int, headers: MutableHeaders) -> bool:
+    if status < 200 or status >= 300 or status in (204, 206):
+        return False
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+# Compressed bodies keyed by "{path}?{query}:{etag}:{encoding}". A strong ETag
+# names exact bytes of one resource, so entries never go stale and changed
+# content simply misses; the URL keeps endpoints whose ETags could coincide apart
+compressed_cache = LRUCache(
+    max_entries=settings.COMPRESSION_CACHE_MAX_ENTRIES,
+    ttl=settings.COMPRESSION_CACHE_TTL_SECONDS,
+    max_bytes=settings.COMPRESSION_CACHE_MAX_BYTES,
+)
+
+class CompressionMiddleware:
+    """Compress responses with the best coding the client accepts.
+
+    Bodies under `minimum_size`, already-encoded or non-text responses and
+    paths under `excluded_paths` go out untouched. Whole bodies carrying a
+    strong ETag are compressed once and then served from `compressed_cache`;
+    streamed bodies are compressed chunk by chunk. Encoded responses get an
+    ETag with an encoding suffix, and suffixed tags in If-None-Match and
+    If-Match are stripped on the way in so endpoints keep comparing the
+    identity ETag.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        excluded_paths: Iterable[str] = (),
+        cache: Optional[LRUCache] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.excluded_paths = tuple(path for path in excluded_paths if path)
+        self.cache = cache
+        self.encoders = available_encoders()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.excluded_paths):
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None or "if-match" in request_headers:
+            # Replaced in place: outer middleware reads what routing adds to this scope
+            scope["headers"] = [
+                (name, normalize_etags(value.decode("latin-1")).encode("latin-1"))
+                if name in (b"if-none-match", b"if-match") else (name, value)
+                for name, value in scope["headers"]
+            ]
+        encoding = negotiate_encoding(request_headers.get("accept-encoding"), self.encoders)
+        resource = f"{scope['path']}?{scope.get('query_string', b'').decode('latin-1')}"
+        responder = _CompressionResponder(self, send, encoding, _opaque_tags(if_none_match), resource)
+        await self.app(scope, receive, responder.send)
+
+    async def compress(self, body: bytes, encoding: str, etag: Optional[str], resource: str = "") -> bytes:
+        cacheable = self.cache is not None and etag and not etag.startswith("W/")
+        cache_key = f"{resource}:{etag}:{encoding}" if cacheable else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        encoder = self.encoders[encoding]
+        if len(body) >= THREAD_MIN_SIZE:
+            compressed = await asyncio.to_thread(encoder.compress, body)
+        else:
+            compressed = encoder.compress(body)
+        if cache_key is not None:
+            self.cache.set(cache_key, compressed)
+        return compressed
+
+class _CompressionResponder:
+    """Per-request send wrapper; decides on the first body message whether and how to compress"""
+
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        send: Send,
+        encoding: Optional[str],
+        client_etags: Set[str],
+        resource: str = "",
+    ):
+        self.middleware = middleware
+        self.app_send = send
+        self.encoding = encoding
+        self.client_etags = client_etags
+        self.resource = resource
+        self.start: Optional[Message] = None
+        self.stream = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.app_send(message)
+            return
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self._begin(start, message)
+            return
+        if self.stream is None:
+            await self.app_send(message)
+            return
+        more_body = message.get("more_body", False)
+        body = self.stream.compress(message.get("body", b""))
+        if not more_body:
+            body += self.stream.finish()
+        if body or not more_body:
+            await self.app_send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    async def _begin(self, start: Message, message: Message) -> None:
+        headers = MutableHeaders(scope=start)
+        status = start["status"]
+        if status == 304:
+            self._not_modified(headers)
+        if not _is_compressible(status, headers):
+            await self.app_send(start)
+            await self.app_send(message)
+            return
+        _add_vary(headers)
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoding is None or (not more_body and len(body) < self.middleware.minimum_size):
+            await self.app_send(start)
+            await self.app_send(message)
+            return
+
+        etag = headers.get("etag")
+        if not more_body:
+            compressed = await self.middleware.compress(body, self.encoding, etag, self.resource)
+            if len(compressed) >= len(body):
+                await self.app_send(start)
+                await self.app_send(message)
+                return
+            self._mark_encoded(headers, etag)
+            headers["content-length"] = str(len(compressed))
+            await self.app_send(start)
+            await self.app_send({"type": "http.response.body", "body": compressed})
+            return
+
+        # Streamed body: the final length is unknown, so Content-Length goes
+        self._mark_encoded(headers, etag)
+        if "content-length" in headers:
+            del headers["content-length"]
+        self.stream = self.middleware.encoders[self.encoding].stream()
+        await self.app_send(start)
+        await self.app_send({"type": "http.response.body", "body": self.stream.compress(body), "more_body": True})
+
+    def _mark_encoded(self, headers: MutableHeaders, etag: Optional[str]) -> None:
+        headers["content-encoding"] = self.encoding
+        if etag:
+            headers["etag"] = encoded_etag(etag, self.encoding)
+
+    def _not_modified(self, headers: MutableHeaders) -> None:
+        # Answer with the tag the client holds: the encoded one if that is what it cached
+        etag = headers.get("etag")
+        if self.encoding is None or not etag:
+            return
+        _add_vary(headers)
+        tagged = encoded_etag(etag, self.encoding)
+        if (tagged[2:] if tagged.startswith("W/") else tagged) in self.client_etags:
+            headers["etag"] = tagged
@@ -1,13 +1,15 @@
 from fastapi import Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import Annotated
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, List, Literal, Optional, Tuple
 
-from app.db.database import get_db
-from app.db.models import Admin as AdminModel
+from app.db.database import get_async_db
+from app.services.admin_service import is_active_admin_async
+from app.db.schemas import ProjectFilter, ProjectStatus
+from app.services.project_service import parse_fields
 
-def is_admin(
+async def is_admin(
     sso_id: Annotated[str, Query(description="SSO ID for admin verification")],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> bool:
     if not sso_id:
         raise HTTPException(
@@ -15,14 +17,32 @@ def is_admin(
             detail="Authentication required"
         )
     
-    admin = db.query(AdminModel).filter(
-        AdminModel.sso_id == sso_id,
-        AdminModel.is_active == True  # Now using Boolean type
-    ).first()
-    
-    if not admin:
+    if not await is_active_admin_async(db, sso_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
         )
     return True
+
+def project_filters(
+    tags: Annotated[List[str], Query(description="Filter by tag (repeatable)")] = [],
+    tech_stack: Annotated[List[str], Query(description="Filter by technology (repeatable)")] = [],
+    project_status: Annotated[
+        List[ProjectStatus],
+        Query(alias="status", description="Filter by status (repeatable)")
+    ] = [],
+    category: Annotated[List[str], Query(description="Filter by category (repeatable)")] = [],
+    match: Annotated[
+        Literal["any", "all"],
+        Query(description="Match any or all of the given tags/tech_stack values")
+    ] = "any",
+) -> ProjectFilter:
+    return ProjectFilter(tags=tags, tech_stack=tech_stack, status=project_status, category=category, match=match)
+
+def project_fields(
+    fields: Annotated[
+        Optional[str],
+        Query(description="Comma-separated fields to return, or * for every field. Defaults to the summary fields")
+    ] = None,
+) -> Optional[Tuple[str, ...]]:
+    return parse_fields(fields)
@@ -1,21 +1,45 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 
-from app.db.database import get_db
-from app.db.models import Admin as AdminModel
+from app.core.config import settings
+from app.db.database import async_engine, async_pool_stats, engine, get_async_db, sync_pool_stats
+from app.db.pool import pool_capacity
+from app.services.admin_service import admin_cache, is_active_admin_async
+from app.api.deps import is_admin
+from app.services.cache import response_cache
+from app.api.compression import compressed_cache
+from app.services.image_resize_service import image_resizer
 
 router = APIRouter()
 
 @router.get("/check")
-def check_admin_status(
+async def check_admin_status(
     sso_id: Annotated[str, Query(description="SSO ID to check admin status")],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Check if user with given sso_id is an admin"""
-    admin = db.query(AdminModel).filter(
-        AdminModel.sso_id == sso_id,
-        AdminModel.is_active == True
-    ).first()
-    
-    return {"is_admin": admin is not None}
\ No newline at end of file
+    return {"is_admin": await is_active_admin_async(db, sso_id)}
+
+@router.get("/cache/stats")
+async def cache_stats(_: bool = Depends(is_admin)):
+    """Hit/miss/eviction counters of the project response, compressed body, resized image and admin membership caches"""
+    return {
+        "projects": response_cache.stats(),
+        "compressed": compressed_cache.stats(),
+        "resized": image_resizer.stats(),
+        "admins": admin_cache.stats(),
+    }
+
+@router.get("/db/pool")
+async def db_pool_stats(_: bool = Depends(is_admin)):
+    """Connection pool occupancy, checkout waits and timeouts of the async (API) and sync engines"""
+    capacities = [pool_capacity(async_engine.sync_engine), pool_capacity(engine)]
+    return {
+        "async": async_pool_stats.snapshot(async_engine.sync_engine.pool),
+        "sync": sync_pool_stats.snapshot(engine.pool),
+        # Per process; multiply by the worker count to compare against Postgres max_connections
+        "max_connections_per_process": None if None in capacities else sum(capacities),
+        "pool_timeout_seconds": settings.DB_POOL_TIMEOUT,
+        "statement_timeout_ms": settings.DB_STATEMENT_TIMEOUT_MS,
+    }
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.db.database import get_async_db
+from app.db.models import ImageJobStatus as ImageJobStatusModel
+from app.db.schemas import ImageJob, ImageJobStatus
+from app.services.image_job_service import get_image_job, get_image_jobs, retry_image_job
+from app.api.deps import is_admin
+
+router = APIRouter()
+
+@router.get("/", response_model=List[ImageJob])
+async def read_image_jobs(
+    job_status: Optional[ImageJobStatus] = Query(None, alias="status", description="Only jobs in this state, e.g. dead"),
+    limit: int = Query(100, ge=1, le=1000),
+    _: bool = Depends(is_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List background image jobs, newest first"""
+    return await get_image_jobs(
+        db, ImageJobStatusModel(job_status.value) if job_status is not None else None, limit
+    )
+
+@router.get("/{job_id}", response_model=ImageJob)
+async def read_image_job(job_id: str, _: bool = Depends(is_admin), db: AsyncSession = Depends(get_async_db)):
+    """Status of a background image job returned by a 202 project write"""
+    job = await get_image_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image job not found")
+    return job
+
+@router.post("/{job_id}/retry", response_model=ImageJob)
+async def retry_dead_image_job(job_id: str, _: bool = Depends(is_admin), db: AsyncSession = Depends(get_async_db)):
+    """Requeue a dead-lettered image job"""
+    job = await retry_image_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image job not found")
+    return job
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import FileResponse
+from typing import Optional
+
+from app.api.http_cache import is_not_modified, not_modified_response
+from app.services.image_resize_service import ResizeRequest, image_resizer
+
+router = APIRouter()
+
+# Variants are derived from content-addressed sources, so a URL's bytes never change
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+@router.get("/{key:path}", response_class=FileResponse)
+async def resized_image(
+    request: Request,
+    key: str,
+    width: int = Query(..., alias="w", description="Target width in pixels; images are never upscaled"),
+    image_format: str = Query("jpeg", alias="format", description="jpeg, webp or png"),
+    quality: Optional[int] = Query(None, alias="q", ge=1, le=100, description="Encoder quality (jpeg, webp)"),
+):
+    """A stored image (the part of its URL after the storage base) resized on demand and cached on disk"""
+    resize = ResizeRequest(key, width, image_format, quality)
+    headers = {"ETag": resize.etag, "Cache-Control": IMMUTABLE}
+    # The ETag depends only on the URL, so revalidation never touches the cache or storage
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+    path = await image_resizer.get(resize)
+    # FileResponse answers Range and If-Range requests against this ETag
+    return FileResponse(path, media_type=resize.content_type, headers=headers)
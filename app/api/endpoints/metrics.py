@@ -0,0 +1,59 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.db.database import async_engine, async_pool_stats, engine, sync_pool_stats
+from app.api.compression import compressed_cache
+from app.services.admin_service import admin_cache
+from app.services.cache import response_cache
+from app.services.image_service import image_processor
+from app.services.metrics import Gauge, registry
+
+router = APIRouter()
+
+db_pool_connections = registry.register(Gauge(
+    "db_pool_connections", "Pooled database connections by engine and state", ("engine", "state")
+))
+db_pool_checkout_timeouts = registry.register(Gauge(
+    "db_pool_checkout_timeouts", "Checkouts that gave up waiting for a free connection", ("engine",)
+))
+db_pool_wait_p95 = registry.register(Gauge(
+    "db_pool_wait_p95_seconds", "95th percentile wait for a pooled connection over recent checkouts", ("engine",)
+))
+image_processor_pending = registry.register(Gauge(
+    "image_processor_pending", "Image jobs queued or running in the processing pool"
+))
+cache_hits = registry.register(Gauge("cache_hits", "Lookups answered from the cache since startup", ("cache",)))
+cache_misses = registry.register(Gauge("cache_misses", "Lookups the cache could not answer since startup", ("cache",)))
+cache_entries = registry.register(Gauge("cache_entries", "Entries currently held by an in-process cache", ("cache",)))
+
+# Caches whose counters are exported, by label
+CACHES = {
+    "projects": response_cache,
+    "compressed": compressed_cache,
+    "admins": admin_cache,
+}
+
+def _collect() -> None:
+    for name, pool, stats in (
+        ("async", async_engine.sync_engine.pool, async_pool_stats),
+        ("sync", engine.pool, sync_pool_stats),
+    ):
+        snapshot = stats.snapshot(pool)
+        for state in ("checked_out", "checked_in", "overflow"):
+            if state in snapshot:
+                db_pool_connections.set(snapshot[state], engine=name, state=state)
+        db_pool_checkout_timeouts.set(snapshot["timeouts"], engine=name)
+        db_pool_wait_p95.set(snapshot["wait_ms_p95"] / 1000, engine=name)
+    image_processor_pending.set(image_processor.pending)
+    for name, cache in CACHES.items():
+        stats = cache.stats()
+        for gauge, key in ((cache_hits, "hits"), (cache_misses, "misses"), (cache_entries, "entries")):
+            if key in stats:
+                gauge.set(stats[key], cache=name)
+
+registry.on_collect(_collect)
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
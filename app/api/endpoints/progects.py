@@ -1,28 +1,91 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Header, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple, Union
+import hashlib
 import json
 
-from app.db.database import get_db
-from app.db.schemas import ProjectCreate, Project
-from app.services.project_service import create_project, get_project, get_projects, update_project, delete_project
-from app.services.s3_service import s3_service
-from app.services.s3_mock import mock_s3_service
+from app.db.database import get_async_db
+from app.db.schemas import (
+    BatchResult, ProjectBatchDelete, ProjectBatchUpdate, ProjectCreate, Project, ProjectFacets, ProjectFilter,
+    ProjectImageAccepted, ProjectImportReport, ProjectPage, ProjectSearchResults, ProjectSummary, ProjectSummaryPage,
+    ProjectUpdate
+)
+from app.services.async_project_service import (
+    create_project, get_project, get_projects, get_projects_page, get_project_facets, update_project, patch_project,
+    delete_project, project_exists, search_projects
+)
+from app.services.project_service import PROJECT_COLUMNS, parse_project_id
+from app.services.batch_service import batch_create, batch_delete, batch_update
+from app.services.bulk_service import export_projects, import_projects
+from app.services.image_job_service import enqueue_image_job
+from app.services.image_store import IMAGE_FIELDS
+from app.services.image_service import read_image_upload
+from app.services.cache import (
+    response_cache, project_cache_key, list_cache_key, invalidate_project, catalog_generation, cache_if_current
+)
+from app.services.storage import get_storage
+from app.services.serializers import dumps, project_serializer
 from app.core.config import settings
-from app.api.deps import is_admin
+from app.api.deps import is_admin, project_fields, project_filters
+from app.api.http_cache import (
+    is_not_modified, not_modified_response, parse_if_match, project_validators, list_validators, pack_entry, unpack_entry
+)
 from app.db.models import Admin
 
 router = APIRouter()
 
-# Choose S3 service based on configuration
-current_s3_service = mock_s3_service if settings.USE_MOCK_S3 else s3_service
+# Largest page a listing returns; offset mode clamps to it, cursor mode rejects more
+LIST_MAX_LIMIT = 1000
 
-@router.post("/", response_model=Project, status_code=status.HTTP_201_CREATED)
+def _serialize_projects(projects, fields: Optional[Tuple[str, ...]]) -> bytes:
+    """JSON array of projects restricted to `fields` (None: every field)"""
+    return project_serializer(fields).dumps_many(projects)
+
+def _json_response(body: bytes, headers: dict) -> Response:
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def _read_async_image(image: Optional[UploadFile], async_image: bool) -> Optional[bytes]:
+    """Validate and read an upload destined for a background job, before anything is written"""
+    if not (async_image and image and image.filename):
+        return None
+    get_storage().validate_image(image)
+    return await read_image_upload(image)
+
+IF_MATCH_HEADER = Header(
+    None,
+    description="ETag from an earlier read; the write fails with 412 if the project changed since",
+)
+
+async def _missing_or_changed(db: AsyncSession, project_id: str, versions) -> HTTPException:
+    """Why a conditional write matched no row; only looked up on that failure path"""
+    if versions is not None and await project_exists(db, project_id):
+        return HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Project was modified since it was read. Fetch it again and retry."
+        )
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+def _image_accepted_response(project, job) -> JSONResponse:
+    body = ProjectImageAccepted(project=project, job=job).model_dump(mode="json")
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED, content=body, headers={"Location": f"/projects/jobs/{job.id}"}
+    )
+
+ASYNC_IMAGE_QUERY = Query(
+    settings.IMAGE_JOBS_ASYNC,
+    description="Process the image in the background and respond 202 with a job to poll at /projects/jobs/{id}"
+)
+
+IMAGE_ACCEPTED_RESPONSES = {202: {"model": ProjectImageAccepted, "description": "Saved; image queued for processing"}}
+
+@router.post("/", response_model=Project, status_code=status.HTTP_201_CREATED, responses=IMAGE_ACCEPTED_RESPONSES)
 async def create_new_project(
     project_data: str = Form(..., description="Project data as JSON string"),
     image: Optional[UploadFile] = File(None, description="Project image file"),
+    async_image: bool = ASYNC_IMAGE_QUERY,
     _: bool = Depends(is_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new project with optional image upload"""
     try:
@@ -40,48 +103,205 @@ async def create_new_project(
             detail=f"Invalid project data: {str(e)}"
         )
     
+    image_data = await _read_async_image(image, async_image)
+    
     # Create project first to get ID
-    db_project = create_project(db, project)
+    db_project = await create_project(db, project)
+    
+    # Hand the image to the background worker and respond right away
+    if image_data is not None:
+        job = await enqueue_image_job(db, db_project.id, image_data, image.filename)
+        invalidate_project()
+        return _image_accepted_response(db_project, job)
     
     # Upload image if provided
     if image and image.filename:
         try:
-            image_url = await current_s3_service.upload_image(image, str(db_project.id))
-            # Update project with image URL
-            db_project.image_url = image_url
-            db.commit()
-            db.refresh(db_project)
+            stored_image = await get_storage().upload_image(image, str(db_project.id))
+            # Update project with image URL and its responsive variants
+            db_project.image_url = stored_image.url
+            db_project.image_variants = stored_image.variants
+            await db.commit()
+            await db.refresh(db_project, attribute_names=PROJECT_COLUMNS)
         except Exception as e:
             # If image upload fails, we can still keep the project
             # but log the error or handle as needed
             print(f"Image upload failed: {str(e)}")
     
+    invalidate_project()
     return db_project
 
+@router.get("/search", response_model=ProjectSearchResults)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over project titles, descriptions, objectives and challenges"""
+    total, projects = await search_projects(db, q, skip, limit)
+    return _json_response(b'{"total":' + dumps(total) + b',"items":' + _serialize_projects(projects, None) + b"}", {})
+
+@router.get("/facets", response_model=ProjectFacets)
+async def read_project_facets(
+    filters: ProjectFilter = Depends(project_filters),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Per-value project counts for status, category, tags and tech_stack under the given filters"""
+    return await get_project_facets(db, filters)
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_catalog(filters: ProjectFilter = Depends(project_filters)):
+    """Stream every project matching the filters as NDJSON, oldest first"""
+    return StreamingResponse(
+        export_projects(filters),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="projects.ndjson"'}
+    )
+
+@router.post("/import", response_model=ProjectImportReport)
+async def import_catalog(request: Request, _: bool = Depends(is_admin), db: AsyncSession = Depends(get_async_db)):
+    """Upsert projects from an NDJSON request body (one project per line, as produced by /export).
+
+    Lines with an existing id replace that project; lines without one are created.
+    Invalid lines are skipped and listed in the report.
+    """
+    return await import_projects(db, request.stream())
+
+@router.post("/batch", response_model=BatchResult)
+async def create_projects_batch(
+    projects: List[ProjectCreate],
+    _: bool = Depends(is_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create many projects in one transaction (images are uploaded separately)"""
+    return await batch_create(db, projects)
+
+@router.patch("/batch", response_model=BatchResult)
+async def update_projects_batch(
+    updates: List[ProjectBatchUpdate],
+    _: bool = Depends(is_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Partially update many projects in one transaction; each item changes only the fields it sends"""
+    return await batch_update(db, updates)
+
+@router.delete("/batch", response_model=BatchResult)
+async def delete_projects_batch(
+    batch: ProjectBatchDelete,
+    _: bool = Depends(is_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete many projects in one transaction, then remove their images from storage in bulk"""
+    result, image_urls = await batch_delete(db, batch.ids)
+    if image_urls:
+        try:
+            await get_storage().delete_images(image_urls)
+        except Exception as e:
+            print(f"Failed to delete images from storage: {str(e)}")
+    return result
+
 @router.get("/{project_id}", response_model=Project)
-def read_project(project_id: str, db: Session = Depends(get_db)):
-    project = get_project(db, project_id)
-    if not project:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    return project
+async def read_project(project_id: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Canonical UUID form, so every spelling of an id shares one cache entry
+    project_id = str(parse_project_id(project_id))
+    cache_key = project_cache_key(project_id)
+    entry = response_cache.get(cache_key)
+    if entry is not None:
+        body, headers = unpack_entry(entry)
+    else:
+        generation = catalog_generation()
+        project = await get_project(db, project_id)
+        if not project:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+        headers = project_validators(project)
+        # Validators only need updated_date, so a match skips serialization entirely
+        if is_not_modified(request, headers):
+            return not_modified_response(headers)
+        body = project_serializer().dumps(project)
+        cache_if_current(cache_key, pack_entry(body, headers), generation)
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+    return _json_response(body, headers)
+
+@router.get("/", response_model=Union[List[ProjectSummary], ProjectSummaryPage, List[Project], ProjectPage])
+async def read_projects(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(
+        100,
+        description=f"Page size. Offset mode clamps it to 0..{LIST_MAX_LIMIT}; cursor mode requires 1..{LIST_MAX_LIMIT}."
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Opaque cursor from a previous page's next_cursor. "
+                    "Pass an empty value to start cursor pagination from the first page."
+    ),
+    filters: ProjectFilter = Depends(project_filters),
+    fields: Optional[Tuple[str, ...]] = Depends(project_fields),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List projects, newest first.
+
+    Without `cursor` the legacy offset mode returns a plain list. With `cursor`
+    the response is a page object carrying `next_cursor` for the following page.
+    Items are `ProjectSummary` objects unless `fields` asks for other fields;
+    only the columns behind the requested fields are read from the database.
+    """
+    if cursor is None:
+        # The offset mode predates the bound; clamp so existing clients keep working
+        limit = min(max(limit, 0), LIST_MAX_LIMIT)
+    elif not 1 <= limit <= LIST_MAX_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"limit must be between 1 and {LIST_MAX_LIMIT} with a cursor"
+        )
+    fingerprint = hashlib.sha1(json.dumps(
+        {
+            "skip": skip, "limit": limit, "cursor": cursor, "filters": filters.model_dump(mode="json"),
+            "fields": fields,
+        },
+        sort_keys=True
+    ).encode()).hexdigest()
+    cache_key = list_cache_key(fingerprint)
+    entry = response_cache.get(cache_key) if cache_key is not None else None
+    if entry is not None:
+        body, headers = unpack_entry(entry)
+        if is_not_modified(request, headers):
+            return not_modified_response(headers)
+        return _json_response(body, headers)
 
-@router.get("/", response_model=List[Project])
-def read_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_projects(db, skip, limit)
+    if cursor is not None:
+        projects, next_cursor = await get_projects_page(db, cursor, limit, filters, fields)
+    else:
+        projects, next_cursor = await get_projects(db, skip, limit, filters, fields), None
+    # Cursor pages wrap the rows in a page object, so the mode is part of the representation
+    mode = "cursor" if cursor is not None else "offset"
+    headers = list_validators(projects, next_cursor, f"{mode}:{','.join(fields) if fields is not None else '*'}")
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+    body = _serialize_projects(projects, fields)
+    if cursor is not None:
+        body = b'{"items":' + body + b',"next_cursor":' + dumps(next_cursor) + b"}"
+    if cache_key is not None:
+        response_cache.set(cache_key, pack_entry(body, headers))
+    return _json_response(body, headers)
 
-@router.put("/{project_id}", response_model=Project)
+@router.put("/{project_id}", response_model=Project, responses=IMAGE_ACCEPTED_RESPONSES)
 async def update_existing_project(
     project_id: str,
     project_data: str = Form(..., description="Project data as JSON string"),
     image: Optional[UploadFile] = File(None, description="New project image file"),
+    async_image: bool = ASYNC_IMAGE_QUERY,
     _: bool = Depends(is_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update an existing project with optional new image upload"""
     try:
         # Parse JSON data from form
         project_dict = json.loads(project_data)
-        project = ProjectCreate(**project_dict)
+        # The image only changes through an upload, which gives back the old one's reference
+        project = ProjectCreate(**{name: value for name, value in project_dict.items() if name not in IMAGE_FIELDS})
     except json.JSONDecodeError:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -94,50 +314,72 @@ async def update_existing_project(
         )
     
     # Get existing project to check for old image
-    existing_project = get_project(db, project_id)
+    existing_project = await get_project(db, project_id)
     if not existing_project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     
+    # The current image stays in place until the background job replaces it
+    image_data = await _read_async_image(image, async_image)
+    
     # Upload new image if provided
-    if image and image.filename:
+    if image_data is None and image and image.filename:
         try:
+            # Upload new image first: re-uploading the same content only adds a reference
+            stored_image = await get_storage().upload_image(image, project_id)
+            project.image_url = stored_image.url
+            project.image_variants = stored_image.variants
+            
             # Delete old image if exists
             if existing_project.image_url:
-                current_s3_service.delete_image(existing_project.image_url)
-            
-            # Upload new image
-            image_url = await current_s3_service.upload_image(image, project_id)
-            project.image_url = image_url
+                await get_storage().delete_image(existing_project.image_url)
         except Exception as e:
             print(f"Image upload failed: {str(e)}")
     
     # Update project
-    updated_project = update_project(db, project_id, project)
+    updated_project = await update_project(db, project_id, project)
     if not updated_project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     
+    invalidate_project(updated_project.id)
+    if image_data is not None:
+        job = await enqueue_image_job(db, updated_project.id, image_data, image.filename)
+        return _image_accepted_response(updated_project, job)
     return updated_project
 
+@router.patch("/{project_id}", response_model=Project)
+async def patch_existing_project(
+    project_id: str,
+    changes: ProjectUpdate,
+    if_match: Optional[str] = IF_MATCH_HEADER,
+    _: bool = Depends(is_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Change only the fields sent, in a single UPDATE, optionally guarded by If-Match"""
+    versions = parse_if_match(if_match, parse_project_id(project_id))
+    project = await patch_project(db, project_id, changes.model_dump(exclude_unset=True), versions)
+    if project is None:
+        raise await _missing_or_changed(db, project_id, versions)
+    invalidate_project(project.id)
+    return _json_response(project_serializer().dumps(project), project_validators(project))
+
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_existing_project(
+async def delete_existing_project(
     project_id: str,
+    if_match: Optional[str] = IF_MATCH_HEADER,
     _: bool = Depends(is_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a project and its associated image from S3"""
-    # Get project to check for image
-    existing_project = get_project(db, project_id)
-    if not existing_project:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    versions = parse_if_match(if_match, parse_project_id(project_id))
+    deleted = await delete_project(db, project_id, versions)
+    if deleted is None:
+        raise await _missing_or_changed(db, project_id, versions)
+    invalidate_project(deleted.id)
     
-    # Delete image from storage if exists
-    if existing_project.image_url:
+    # The row is gone first, so a failed storage delete leaves an orphan for the
+    # reconciler rather than a project pointing at a missing image
+    if deleted.image_url:
         try:
-            current_s3_service.delete_image(existing_project.image_url)
+            await get_storage().delete_image(deleted.image_url)
         except Exception as e:
             print(f"Failed to delete image from storage: {str(e)}")
-    
-    # Delete project from database
-    success = delete_project(db, project_id)
-    if not success:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
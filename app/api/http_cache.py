@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import uuid
+
+EPOCH = datetime(1970, 1, 1)
+
+def _timestamp_us(value: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+def project_etag(project) -> str:
+    """Strong ETag of a single project: its id plus updated_date in microseconds"""
+    return f'"{project.id.hex}-{_timestamp_us(project.updated_date):x}"'
+
+def list_etag(projects: Iterable, next_cursor: Optional[str] = None, representation: str = "") -> str:
+    """Strong ETag of a listing page, derived from the ids and versions of its rows.
+
+    `representation` names the body shape (pagination mode and requested
+    fields), so different views of the same rows never share an ETag.
+    """
+    digest = hashlib.sha1()
+    for project in projects:
+        digest.update(f"{project.id.hex}-{_timestamp_us(project.updated_date):x};".encode())
+    digest.update((next_cursor or "").encode())
+    digest.update(representation.encode())
+    return f'"l-{digest.hexdigest()}"'
+
+def parse_if_match(if_match: Optional[str], project_id: uuid.UUID) -> Optional[List[datetime]]:
+    """The updated_date values an If-Match header accepts for a project.
+
+    None means no precondition (header absent or "*"). An empty list can
+    never match: weak tags fail the strong comparison If-Match requires,
+    and tags of other projects or representations never name this one.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    versions = []
+    for candidate in if_match.split(","):
+        candidate = candidate.strip()
+        if not (candidate.startswith('"') and candidate.endswith('"')):
+            continue
+        project_hex, _, timestamp = candidate[1:-1].partition("-")
+        if project_hex != project_id.hex:
+            continue
+        try:
+            versions.append(EPOCH + timedelta(microseconds=int(timestamp, 16)))
+        except ValueError:
+            continue
+    return versions
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def project_validators(project) -> Dict[str, str]:
+    return {
+        "ETag": project_etag(project),
+        "Last-Modified": http_date(project.updated_date),
+        "Cache-Control": "no-cache",
+    }
+
+def list_validators(projects: Iterable, next_cursor: Optional[str] = None, representation: str = "") -> Dict[str, str]:
+    return {"ETag": list_etag(projects, next_cursor, representation), "Cache-Control": "no-cache"}
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison function, so W/ prefixes are ignored
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no entity tag was sent"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return "ETag" in headers and _etag_matches(if_none_match, headers["ETag"])
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and "Last-Modified" in headers:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+            modified = parsedate_to_datetime(headers["Last-Modified"])
+        except (TypeError, ValueError):
+            return False
+        return modified <= since
+    return False
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
+def pack_entry(body: bytes, headers: Dict[str, str]) -> bytes:
+    """Bundle a response body with its validator headers for the response cache"""
+    return json.dumps(headers).encode() + b"\n" + body
+
+def unpack_entry(entry: bytes) -> Tuple[bytes, Dict[str, str]]:
+    header_line, body = entry.split(b"\n", 1)
+    return body, json.loads(header_line)
@@ -0,0 +1,52 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import time
+
+from app.services.metrics import (
+    RequestQueries, current_request_queries, db_queries_per_request, http_request_duration, http_requests,
+    http_requests_in_flight,
+)
+
+def route_template(scope: Scope, root_path: str) -> str:
+    """Route path pattern the request matched, so ids never become label values"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Mounts (e.g. /uploads) only leave their prefix in root_path
+    if scope.get("root_path", "") != root_path:
+        return scope["root_path"][len(root_path):] or "/"
+    return "unmatched"
+
+class MetricsMiddleware:
+    """Record latency, status and in-flight count per route, plus the SQL statements each request issues"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        root_path = scope.get("root_path", "")
+        queries = RequestQueries(lambda: route_template(scope, root_path))
+        token = current_request_queries.set(queries)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec(method=method)
+            current_request_queries.reset(token)
+            route = route_template(scope, root_path)
+            http_requests.inc(method=method, route=route, status=str(status_code))
+            http_request_duration.observe(elapsed, method=method, route=route)
+            db_queries_per_request.observe(queries.count, route=route)
@@ -7,17 +7,101 @@ load_dotenv()
 class Settings:
     # Database
     SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL") or os.getenv("DB_URL")
+    # Per engine (the API's async engine and the sync one each get a pool), so one
+    # process opens at most 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; -1 never recycles
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))  # Postgres only; 0 disables
+    # Run `python -m app.db.migrate` at API startup instead of as a separate deploy step
+    DB_MIGRATE_ON_STARTUP: bool = os.getenv("DB_MIGRATE_ON_STARTUP", "false").lower() == "true"
     
     # AWS S3 Configuration
     AWS_ACCESS_KEY_ID: Optional[str] = os.getenv("AWS_ACCESS_KEY_ID")
     AWS_SECRET_ACCESS_KEY: Optional[str] = os.getenv("AWS_SECRET_ACCESS_KEY")
     AWS_REGION: str = os.getenv("AWS_REGION", "us-east-1")
     S3_BUCKET_NAME: str = os.getenv("S3_BUCKET_NAME", "projects-catalog-images")
+    # Set to use an S3-compatible endpoint such as MinIO or LocalStack
+    S3_ENDPOINT_URL: Optional[str] = os.getenv("S3_ENDPOINT_URL")
+    S3_MAX_POOL_CONNECTIONS: int = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32"))
+    S3_MAX_ATTEMPTS: int = int(os.getenv("S3_MAX_ATTEMPTS", "5"))
+    S3_CONNECT_TIMEOUT: float = float(os.getenv("S3_CONNECT_TIMEOUT", "3"))
+    S3_READ_TIMEOUT: float = float(os.getenv("S3_READ_TIMEOUT", "10"))
+    S3_MULTIPART_THRESHOLD: int = int(os.getenv("S3_MULTIPART_THRESHOLD", str(8 * 1024 * 1024)))  # 8MB
+    S3_MULTIPART_CHUNKSIZE: int = int(os.getenv("S3_MULTIPART_CHUNKSIZE", str(8 * 1024 * 1024)))  # 8MB
     
     # File Upload
     MAX_FILE_SIZE: int = 5 * 1024 * 1024  # 5MB
+    MAX_IMAGE_PIXELS: int = int(os.getenv("MAX_IMAGE_PIXELS", str(40_000_000)))  # e.g. 8000x5000
     ALLOWED_IMAGE_TYPES: list = ["image/jpeg", "image/png", "image/gif", "image/webp"]
     
+    # Responsive Image Variants (bounding-box sizes in px, and output formats)
+    IMAGE_VARIANT_SIZES: list = [int(size) for size in os.getenv("IMAGE_VARIANT_SIZES", "160,480,1024").split(",")]
+    IMAGE_VARIANT_FORMATS: list = os.getenv("IMAGE_VARIANT_FORMATS", "jpeg,webp").split(",")
+    
+    # On-demand Resizing (GET /images/{key}?w=&format=&q=), cached on local disk
+    IMAGE_RESIZE_CACHE_DIR: str = os.getenv("IMAGE_RESIZE_CACHE_DIR", "/app/image-cache")
+    IMAGE_RESIZE_CACHE_MAX_BYTES: int = int(os.getenv("IMAGE_RESIZE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))  # 512MB per process
+    IMAGE_RESIZE_MAX_WIDTH: int = int(os.getenv("IMAGE_RESIZE_MAX_WIDTH", "2048"))
+    IMAGE_RESIZE_FORMATS: list = os.getenv("IMAGE_RESIZE_FORMATS", "jpeg,webp,png").split(",")
+    
+    # Image Processing Pool
+    IMAGE_WORKER_MODE: str = os.getenv("IMAGE_WORKER_MODE", "process")  # "process" or "thread"
+    IMAGE_WORKERS: Optional[int] = int(os.getenv("IMAGE_WORKERS")) if os.getenv("IMAGE_WORKERS") else None
+    IMAGE_MAX_QUEUE: int = int(os.getenv("IMAGE_MAX_QUEUE", "32"))
+    IMAGE_JOB_TIMEOUT_SECONDS: float = float(os.getenv("IMAGE_JOB_TIMEOUT_SECONDS", "30"))
+
+    # Background Image Jobs
+    IMAGE_JOBS_ASYNC: bool = os.getenv("IMAGE_JOBS_ASYNC", "false").lower() == "true"  # default for ?async_image=
+    IMAGE_JOBS_WORKER: bool = os.getenv("IMAGE_JOBS_WORKER", "true").lower() == "true"  # run a worker in the API process
+    IMAGE_JOBS_STAGING_DIR: str = os.getenv("IMAGE_JOBS_STAGING_DIR", "/app/staging")
+    IMAGE_JOBS_MAX_ATTEMPTS: int = int(os.getenv("IMAGE_JOBS_MAX_ATTEMPTS", "5"))
+    IMAGE_JOBS_RETRY_BASE_SECONDS: float = float(os.getenv("IMAGE_JOBS_RETRY_BASE_SECONDS", "2"))
+    IMAGE_JOBS_POLL_SECONDS: float = float(os.getenv("IMAGE_JOBS_POLL_SECONDS", "1"))
+    IMAGE_JOBS_CONCURRENCY: int = int(os.getenv("IMAGE_JOBS_CONCURRENCY", "2"))
+    IMAGE_JOBS_LEASE_SECONDS: int = int(os.getenv("IMAGE_JOBS_LEASE_SECONDS", "300"))
+
+    # Storage Reconciliation (python -m app.reconcile)
+    # Objects younger than this are never deleted: uploads write them before the referencing row commits
+    STORAGE_RECONCILE_GRACE_HOURS: float = float(os.getenv("STORAGE_RECONCILE_GRACE_HOURS", "24"))
+
+    # Bulk Export / Import
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+    IMPORT_MAX_LINE_BYTES: int = int(os.getenv("IMPORT_MAX_LINE_BYTES", str(1024 * 1024)))  # 1MB
+    IMPORT_MAX_REPORTED_ERRORS: int = int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", "1000"))
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "5000"))  # per /projects/batch request
+    
+    # Response Cache
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", "60"))
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+    CACHE_MAX_BYTES: int = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 64MB
+    CACHE_REDIS_URL: Optional[str] = os.getenv("CACHE_REDIS_URL")
+    
+    # Response Compression
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes; smaller bodies go out as-is
+    COMPRESSION_EXCLUDED_PATHS: list = os.getenv("COMPRESSION_EXCLUDED_PATHS", "/uploads").split(",")  # path prefixes
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+    COMPRESSION_ZSTD_LEVEL: int = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+    COMPRESSION_CACHE_MAX_ENTRIES: int = int(os.getenv("COMPRESSION_CACHE_MAX_ENTRIES", "1024"))
+    COMPRESSION_CACHE_MAX_BYTES: int = int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # 32MB
+    COMPRESSION_CACHE_TTL_SECONDS: int = int(os.getenv("COMPRESSION_CACHE_TTL_SECONDS", "3600"))
+    
+    # Metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"  # serves /metrics
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "200"))  # 0 disables the slow-query log
+    SLOW_QUERY_LOG_CHARS: int = int(os.getenv("SLOW_QUERY_LOG_CHARS", "1000"))  # statement text kept per entry
+    
+    # Admin Membership Cache
+    ADMIN_CACHE_TTL_SECONDS: int = int(os.getenv("ADMIN_CACHE_TTL_SECONDS", "30"))
+    ADMIN_NEGATIVE_CACHE_TTL_SECONDS: int = int(os.getenv("ADMIN_NEGATIVE_CACHE_TTL_SECONDS", "5"))
+    ADMIN_CACHE_MAX_ENTRIES: int = int(os.getenv("ADMIN_CACHE_MAX_ENTRIES", "10000"))
+    
     # Mock S3 Toggle
     USE_MOCK_S3: bool = os.getenv("USE_MOCK_S3", "true").lower() == "true"
     
@@ -25,6 +109,8 @@ class Settings:
     def S3_BASE_URL(self) -> str:
         if self.USE_MOCK_S3:
             return "http://localhost:8000/uploads"
+        if self.S3_ENDPOINT_URL:
+            return f"{self.S3_ENDPOINT_URL.rstrip('/')}/{self.S3_BUCKET_NAME}"
         return f"https://{self.S3_BUCKET_NAME}.s3.{self.AWS_REGION}.amazonaws.com"
 
 settings = Settings()
@@ -1,12 +1,41 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.pool import PoolStats, engine_options, instrument_engine
+
+# Async drivers used by the API for each sync URL scheme
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url: str) -> str:
+    """Translate a sync database URL into its async-driver equivalent"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS or parsed.drivername == ASYNC_DRIVERS[backend]:
+        return url
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
 
 SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URL
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+# Sync engine for scripts and maintenance tasks
+sync_pool_stats = PoolStats()
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL, False, sync_pool_stats))
+instrument_engine(engine, sync_pool_stats)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine used by the API
+ASYNC_DATABASE_URL = async_database_url(SQLALCHEMY_DATABASE_URL)
+async_pool_stats = PoolStats()
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, True, async_pool_stats))
+instrument_engine(async_engine.sync_engine, async_pool_stats)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -15,4 +44,12 @@ def get_db():
         yield db
     finally:
         db.close()
-        
\ No newline at end of file
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def set_statement_timeout(db, milliseconds: int) -> None:
+    """Override the statement timeout for the rest of the session's current transaction (Postgres only; 0 disables it)"""
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text(f"SET LOCAL statement_timeout = {int(milliseconds)}"))
@@ -0,0 +1,51 @@
+"""Create or bring the database schema up to date.
+
+Run with `python -m app.db.migrate` before starting API or worker processes
+(the Docker image does this), or set DB_MIGRATE_ON_STARTUP=true to run it in
+the API's lifespan instead. Every step is idempotent.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+
+from app.db.database import Base, engine
+from app.db import models  # noqa: F401  registers every table on Base.metadata
+from app.db.models import PROJECT_SEARCH_DDL
+
+# Columns added to tables that already existed: (table, column, Postgres type, type elsewhere)
+ADDED_COLUMNS = [
+    ("projects", "image_variants", "JSONB", "JSON"),
+]
+
+def add_missing_columns(connection) -> None:
+    """create_all never alters an existing table, so later columns are added here"""
+    postgres = connection.dialect.name == "postgresql"
+    for table, column, postgres_type, other_type in ADDED_COLUMNS:
+        if postgres:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {postgres_type}"))
+        # SQLite has no IF NOT EXISTS for columns
+        elif column not in {existing["name"] for existing in inspect(connection).get_columns(table)}:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {other_type}"))
+
+def create_missing_indexes(connection) -> None:
+    """create_all only indexes the tables it creates, so indexes declared later
+    (keyset pagination, facet filters, the GIN tag indexes) are added here"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+
+def migrate(bind=engine) -> None:
+    """Create missing tables, columns and indexes, then the Postgres full-text column and index"""
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as connection:
+        add_missing_columns(connection)
+        create_missing_indexes(connection)
+    # after_create only fires for new tables, so databases created before the
+    # search column existed get it here
+    if bind.dialect.name == "postgresql":
+        with bind.begin() as connection:
+            for statement in PROJECT_SEARCH_DDL:
+                connection.execute(text(statement))
+
+if __name__ == "__main__":
+    migrate()
+    print("Database schema is up to date")
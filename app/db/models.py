@@ -1,42 +1,128 @@
-from sqlalchemy import Column, String, Text, Enum, TIMESTAMP, Boolean
+from sqlalchemy import Column, String, Text, Enum, TIMESTAMP, Boolean, Index, Integer, JSON, DDL, event
 from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 import enum
 import uuid
 
 from app.db.database import Base
 
+# JSONB on Postgres, plain JSON elsewhere (e.g. SQLite in tests)
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 class ProjectStatus(enum.Enum):
     Development = "Development"
     Active = "Active"
     Inactive = "Inactive"
     Archived = "Archived"
 
+DETAIL_GROUP = "detail"
+
 class Project(Base):
     __tablename__ = "projects"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String(200), nullable=False)
     description = Column(Text)
-    detailed_description = Column(Text)
+    # Large text only shown on the project page: deferred, so list queries never
+    # select it; item queries load the group with undefer_group(DETAIL_GROUP)
+    detailed_description = deferred(Column(Text), group=DETAIL_GROUP)
     category = Column(String(100))
     status = Column(Enum(ProjectStatus), default=ProjectStatus.Development)
-    tags = Column(JSONB, default=list)
+    tags = Column(JSONType, default=list)
     image_path = Column(String(255))
     image_url = Column(String(500))
-    metrics = Column(JSONB, default=dict)
+    image_variants = Column(JSONType, default=dict)
+    metrics = Column(JSONType, default=dict)
     created_by = Column(String(100))
-    tech_stack = Column(JSONB, default=list)
+    tech_stack = Column(JSONType, default=list)
     team_name = Column(String(200))
     product_manager = Column(String(200))
     external_url = Column(String(500))
-    performance_metrics = Column(Text)
-    objectives = Column(Text)
-    challenges = Column(Text)
-    future_plans = Column(Text)
+    performance_metrics = deferred(Column(Text), group=DETAIL_GROUP)
+    objectives = deferred(Column(Text), group=DETAIL_GROUP)
+    challenges = deferred(Column(Text), group=DETAIL_GROUP)
+    future_plans = deferred(Column(Text), group=DETAIL_GROUP)
     created_date = Column(TIMESTAMP, server_default=func.current_timestamp())
     updated_date = Column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
 
+    __table_args__ = (
+        # Supports the stable (created_date, id) ordering used for keyset pagination
+        Index("ix_projects_created_date_id", "created_date", "id"),
+        # Facet filters: btree for the scalar columns, GIN over the JSONB arrays.
+        # jsonb_path_ops only supports @>, which is all the tag filters use.
+        Index("ix_projects_status", "status"),
+        Index("ix_projects_category", "category"),
+        Index("ix_projects_tags", "tags", postgresql_using="gin", postgresql_ops={"tags": "jsonb_path_ops"}),
+        Index(
+            "ix_projects_tech_stack", "tech_stack",
+            postgresql_using="gin", postgresql_ops={"tech_stack": "jsonb_path_ops"}
+        ),
+    )
+
+# Weighted full-text document maintained by Postgres itself as a generated column,
+# so every insert/update keeps it current without application code.
+PROJECT_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(detailed_description, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(objectives, '')), 'D') || "
+    "setweight(to_tsvector('english', coalesce(challenges, '')), 'D')"
+)
+
+PROJECT_SEARCH_DDL = [
+    f"ALTER TABLE projects ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS ({PROJECT_SEARCH_VECTOR}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_projects_search_vector ON projects USING GIN (search_vector)",
+]
+
+for statement in PROJECT_SEARCH_DDL:
+    event.listen(Project.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+class ImageJobStatus(enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    # Exhausted its attempts or failed permanently; kept for inspection and manual retry
+    dead = "dead"
+
+class ImageJob(Base):
+    """Durable queue entry for processing an uploaded image in the background"""
+    __tablename__ = "image_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    status = Column(Enum(ImageJobStatus), default=ImageJobStatus.queued, nullable=False)
+    # Raw upload waiting in IMAGE_JOBS_STAGING_DIR
+    staged_path = Column(String(500), nullable=False)
+    original_filename = Column(String(255))
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, nullable=False)
+    last_error = Column(Text)
+    # Naive UTC, always set by the application so comparisons are portable
+    run_after = Column(TIMESTAMP, nullable=False)
+    locked_at = Column(TIMESTAMP)
+    image_url = Column(String(500))
+    created_date = Column(TIMESTAMP, server_default=func.current_timestamp())
+    updated_date = Column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
+
+    __table_args__ = (
+        # Workers poll for the oldest due job of a given status
+        Index("ix_image_jobs_status_run_after", "status", "run_after"),
+    )
+
+class ImageBlob(Base):
+    """Processed variants of one source image, shared by every project that uploads it"""
+    __tablename__ = "image_blobs"
+
+    # images/{source sha256}/{variant params digest}; objects live under it
+    prefix = Column(String(200), primary_key=True)
+    image_url = Column(String(500), nullable=False)
+    image_variants = Column(JSONType, default=dict)
+    # Number of project images pointing at this blob; its objects are deleted at zero
+    refcount = Column(Integer, default=0, nullable=False)
+    created_date = Column(TIMESTAMP, server_default=func.current_timestamp())
+
 class Admin(Base):
     __tablename__ = "admins"
 
@@ -0,0 +1,160 @@
+from collections import deque
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from typing import Deque, Dict, Optional
+import threading
+import time
+
+from app.core.config import settings
+
+# Checkout waits kept for the percentiles in the stats
+RECENT_WAITS = 1024
+
+class PoolStats:
+    """Checkout, wait and overflow counters of one connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits: Deque[float] = deque(maxlen=RECENT_WAITS)
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._waits.append(seconds)
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_checkout(self, pool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            if isinstance(pool, QueuePool):
+                self.peak_checked_out = max(self.peak_checked_out, pool.checkedout())
+                self.peak_overflow = max(self.peak_overflow, pool.overflow())
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {"pool_class": type(pool).__name__}
+            if isinstance(pool, QueuePool):
+                stats.update({
+                    "size": pool.size(),
+                    "max_overflow": pool._max_overflow,
+                    "checked_out": pool.checkedout(),
+                    "checked_in": pool.checkedin(),
+                    "overflow": max(0, pool.overflow()),
+                })
+            stats.update({
+                "peak_checked_out": self.peak_checked_out,
+                "peak_overflow": self.peak_overflow,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": self.wait_seconds_total / len(waits) * 1000 if waits else 0.0,
+                "wait_ms_max": self.wait_seconds_max * 1000,
+            })
+        for percentile in (50, 95, 99):
+            stats[f"wait_ms_p{percentile}"] = (
+                waits[min(len(waits) - 1, len(waits) * percentile // 100)] * 1000 if waits else 0.0
+            )
+        return stats
+
+def instrumented_pool_class(base, stats: PoolStats):
+    """Subclass of `base` timing every checkout, including the wait for a free connection.
+
+    The stats live on the class, so they survive `engine.dispose()`, which
+    rebuilds the pool from its class.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except exc.TimeoutError:
+            stats.record_timeout()
+            raise
+        stats.record_wait(time.perf_counter() - started)
+        return connection
+
+    return type(f"Instrumented{base.__name__}", (base,), {"_do_get": _do_get, "stats": stats})
+
+def _statement_timeout_args(url) -> Dict:
+    timeout = settings.DB_STATEMENT_TIMEOUT_MS
+    if not timeout or url.get_backend_name() != "postgresql":
+        return {}
+    if url.get_driver_name() == "asyncpg":
+        return {"server_settings": {"statement_timeout": str(timeout)}}
+    return {"options": f"-c statement_timeout={timeout}"}
+
+def engine_options(database_url: str, is_async: bool, stats: PoolStats) -> Dict:
+    """create_engine keyword arguments for the pool and statement-timeout settings"""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection and keeps its default pool
+        return {}
+    options = {
+        "poolclass": instrumented_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool, stats),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        # A SQLite file has no server to drop idle connections, and aiosqlite's
+        # ping garbles rows of a streamed result on the same connection
+        "pool_pre_ping": settings.DB_POOL_PRE_PING and url.get_backend_name() != "sqlite",
+    }
+    connect_args = _statement_timeout_args(url)
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+def instrument_engine(engine, stats: PoolStats) -> None:
+    """Count checkouts, checkins, new connections and invalidations of a sync engine's pool"""
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.record_checkout(engine.pool)
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        stats.record_checkin()
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        stats.record_connect()
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(dbapi_connection, connection_record, exception):
+        stats.record_invalidation()
+
+def pool_capacity(engine) -> Optional[int]:
+    """Most connections this engine can open (pool_size + max_overflow), None if unbounded"""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool) or pool._max_overflow < 0:
+        return None
+    return pool.size() + pool._max_overflow
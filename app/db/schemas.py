@@ -1,5 +1,5 @@
-from pydantic import BaseModel, UUID4
-from typing import List, Dict, Optional
+from pydantic import BaseModel, Field, UUID4, computed_field, field_validator
+from typing import List, Dict, Optional, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -18,6 +18,8 @@ class ProjectBase(BaseModel):
     tags: List[str] = []
     image_path: Optional[str] = None
     image_url: Optional[str] = None
+    # {format: {width: url}} for every stored variant, e.g. {"webp": {"480": "https://..."}}
+    image_variants: Optional[Dict[str, Dict[str, str]]] = {}
     metrics: Dict = {}
     created_by: Optional[str] = None
     tech_stack: List[str] = []
@@ -32,14 +34,174 @@ class ProjectBase(BaseModel):
 class ProjectCreate(ProjectBase):
     pass
 
+def image_srcset(image_variants: Optional[Dict[str, Dict[str, str]]]) -> Dict[str, str]:
+    """Ready-made srcset attribute value per format"""
+    return {
+        image_format: ", ".join(
+            f"{url} {width}w" for width, url in sorted(urls.items(), key=lambda item: int(item[0]))
+        )
+        for image_format, urls in (image_variants or {}).items()
+    }
+
 class Project(ProjectBase):
     id: UUID4
     created_date: datetime
     updated_date: datetime
 
+    @computed_field
+    @property
+    def image_srcset(self) -> Dict[str, str]:
+        """Ready-made srcset attribute value per format"""
+        return image_srcset(self.image_variants)
+
+    class Config:
+        from_attributes = True
+
+class ProjectSummary(BaseModel):
+    """Card-sized projection used by list endpoints; leaves out the long text fields"""
+    id: UUID4
+    title: str
+    description: Optional[str] = None
+    category: Optional[str] = None
+    status: ProjectStatus = ProjectStatus.Development
+    tags: List[str] = []
+    tech_stack: List[str] = []
+    team_name: Optional[str] = None
+    image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, Dict[str, str]]] = {}
+    external_url: Optional[str] = None
+    created_date: datetime
+    updated_date: datetime
+
+    @computed_field
+    @property
+    def image_srcset(self) -> Dict[str, str]:
+        """Ready-made srcset attribute value per format"""
+        return image_srcset(self.image_variants)
+
+    class Config:
+        from_attributes = True
+
+class ProjectUpdate(BaseModel):
+    """Partial project: only the fields that are sent are changed.
+
+    The image fields are left out: replacing an image has to release the old
+    blob, which only the multipart PUT does.
+    """
+    title: Optional[str] = None
+    description: Optional[str] = None
+    detailed_description: Optional[str] = None
+    category: Optional[str] = None
+    status: Optional[ProjectStatus] = None
+    tags: Optional[List[str]] = None
+    metrics: Optional[Dict] = None
+    created_by: Optional[str] = None
+    tech_stack: Optional[List[str]] = None
+    team_name: Optional[str] = None
+    product_manager: Optional[str] = None
+    external_url: Optional[str] = None
+    performance_metrics: Optional[str] = None
+    objectives: Optional[str] = None
+    challenges: Optional[str] = None
+    future_plans: Optional[str] = None
+
+    @field_validator("title")
+    @classmethod
+    def title_not_null(cls, value):
+        # Only runs for a title that was sent; an explicit null cannot clear a required column
+        if value is None:
+            raise ValueError("title cannot be null")
+        return value
+
+class ProjectBatchUpdate(ProjectUpdate):
+    id: UUID4
+
+class ProjectBatchDelete(BaseModel):
+    ids: List[UUID4] = Field(..., min_length=1)
+
+class BatchItemResult(BaseModel):
+    # Position of the item in the request array
+    index: int
+    id: Optional[UUID4] = None
+    status: Literal["created", "updated", "deleted", "not_found", "duplicate"]
+    project: Optional[Project] = None
+
+class BatchResult(BaseModel):
+    succeeded: int
+    failed: int
+    items: List[BatchItemResult]
+
+class ProjectPage(BaseModel):
+    items: List[Project]
+    next_cursor: Optional[str] = None
+
+class ProjectSummaryPage(BaseModel):
+    items: List[ProjectSummary]
+    next_cursor: Optional[str] = None
+
+class ProjectFilter(BaseModel):
+    tags: List[str] = []
+    tech_stack: List[str] = []
+    status: List[ProjectStatus] = []
+    category: List[str] = []
+    # Whether a project must carry any or all of the requested tags/tech_stack values
+    match: Literal["any", "all"] = "any"
+
+class ProjectFacets(BaseModel):
+    total: int
+    status: Dict[str, int] = {}
+    category: Dict[str, int] = {}
+    tags: Dict[str, int] = {}
+    tech_stack: Dict[str, int] = {}
+
+class ProjectSearchResults(BaseModel):
+    total: int
+    items: List[Project]
+
+class ProjectImport(ProjectCreate):
+    """One NDJSON line of a bulk import; an existing id is replaced, a missing one is generated"""
+    id: Optional[UUID4] = None
+    created_date: Optional[datetime] = None
+
+class ImportRowError(BaseModel):
+    line: int
+    id: Optional[str] = None
+    error: str
+
+class ProjectImportReport(BaseModel):
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    # Capped at IMPORT_MAX_REPORTED_ERRORS; `failed` counts every rejected line
+    errors: List[ImportRowError] = []
+
+class ImageJobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    dead = "dead"
+
+class ImageJob(BaseModel):
+    id: UUID4
+    project_id: UUID4
+    status: ImageJobStatus
+    original_filename: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    run_after: datetime
+    image_url: Optional[str] = None
+    created_date: datetime
+    updated_date: datetime
+
     class Config:
         from_attributes = True
 
+class ProjectImageAccepted(BaseModel):
+    """202 body of a write whose image is processed in the background"""
+    project: Project
+    job: ImageJob
+
 class AdminBase(BaseModel):
     sso_id: str
 
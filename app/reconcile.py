@@ -0,0 +1,38 @@
+"""Delete stored images that no project or image blob references.
+
+Run with `python -m app.reconcile --dry-run` first to see what would go,
+then without it. It needs the same DATABASE_URL and storage settings as the
+API. With --checkpoint, an interrupted run picks up where it stopped.
+"""
+import argparse
+import asyncio
+import json
+
+from app.core.config import settings
+from app.services.reconcile_service import StorageReconciler
+from app.services.storage import shutdown_storage
+
+async def main(args):
+    reconciler = StorageReconciler(
+        grace_seconds=args.grace_hours * 3600,
+        dry_run=args.dry_run,
+        page_size=args.page_size,
+        checkpoint_path=args.checkpoint,
+    )
+    try:
+        report = await reconciler.run(args.prefix)
+    finally:
+        shutdown_storage()
+    print(json.dumps(report.to_dict(), indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report orphans without deleting them")
+    parser.add_argument("--prefix", default="", help="Only reconcile keys under this prefix, e.g. images/")
+    parser.add_argument("--grace-hours", type=float, default=settings.STORAGE_RECONCILE_GRACE_HOURS)
+    parser.add_argument("--page-size", type=int, default=1000, help="Keys per storage listing page")
+    parser.add_argument("--checkpoint", help="JSON file recording progress, for resuming an interrupted run")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        print("Storage reconcile interrupted")
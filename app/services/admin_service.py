@@ -0,0 +1,73 @@
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from typing import Optional
+
+from app.core.config import settings
+from app.db.models import Admin as AdminModel
+from app.services.cache import LRUCache
+
+# Membership is cached per process with a short TTL; negative answers expire
+# sooner so a newly added admin is recognized quickly
+admin_cache = LRUCache(
+    max_entries=settings.ADMIN_CACHE_MAX_ENTRIES,
+    ttl=settings.ADMIN_CACHE_TTL_SECONDS,
+)
+
+def _active_admin_query(sso_id: str):
+    return select(AdminModel.sso_id).where(
+        AdminModel.sso_id == sso_id,
+        AdminModel.is_active == True
+    )
+
+def _remember(sso_id: str, is_active: bool) -> bool:
+    if is_active:
+        admin_cache.set(sso_id, b"1")
+    else:
+        admin_cache.set(sso_id, b"0", ttl=settings.ADMIN_NEGATIVE_CACHE_TTL_SECONDS)
+    return is_active
+
+def is_active_admin(db: Session, sso_id: str) -> bool:
+    """Return whether sso_id belongs to an active admin, using the membership cache"""
+    cached = admin_cache.get(sso_id)
+    if cached is not None:
+        return cached == b"1"
+    return _remember(sso_id, db.execute(_active_admin_query(sso_id)).first() is not None)
+
+async def is_active_admin_async(db: AsyncSession, sso_id: str) -> bool:
+    """Async variant of is_active_admin sharing the same cache"""
+    cached = admin_cache.get(sso_id)
+    if cached is not None:
+        return cached == b"1"
+    return _remember(sso_id, (await db.execute(_active_admin_query(sso_id))).first() is not None)
+
+def invalidate_admin(sso_id: Optional[str] = None) -> None:
+    """Forget the cached membership of one admin, or of everyone"""
+    if sso_id is None:
+        admin_cache.clear()
+    else:
+        admin_cache.delete(sso_id)
+
+# session.info key of the sso_ids a transaction wrote. They are forgotten only
+# once it commits: evicting at flush would let a concurrent lookup re-cache the
+# old row before the commit lands, and a rollback evict for nothing.
+PENDING_INVALIDATIONS = "admin_cache_invalidations"
+
+@event.listens_for(AdminModel, "after_insert")
+@event.listens_for(AdminModel, "after_update")
+@event.listens_for(AdminModel, "after_delete")
+def _invalidate_admin_row(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        invalidate_admin(target.sso_id)
+    else:
+        session.info.setdefault(PENDING_INVALIDATIONS, set()).add(target.sso_id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_admins(session):
+    for sso_id in session.info.pop(PENDING_INVALIDATIONS, ()):
+        invalidate_admin(sso_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_admin_invalidations(session):
+    session.info.pop(PENDING_INVALIDATIONS, None)
@@ -0,0 +1,144 @@
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer_group
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import uuid
+
+from app.db.models import DETAIL_GROUP, Project as ProjectModel
+from app.db.schemas import ProjectBatchUpdate, ProjectCreate, ProjectFacets, ProjectFilter, Project as ProjectSchema
+from app.services.image_store import without_stored_image
+from app.services.project_service import (
+    project_query, projects_query, projects_page_query, split_page, facets_query, facets_from_rows, dialect_name,
+    project_values, existing_ids_query, projects_by_ids_query, delete_projects_query, patch_project_query,
+    delete_project_query, version_condition, version_timestamp, parse_project_id, PROJECT_COLUMNS
+)
+from app.services.search_service import (
+    search_query, search_count_query, fallback_page_ids, order_by_ids, index_projects, unindex_projects, SEARCH_FIELDS
+)
+
+async def create_project(db: AsyncSession, project: ProjectCreate) -> ProjectSchema:
+    db_project = ProjectModel(**without_stored_image(project.model_dump()))
+    db.add(db_project)
+    await db.commit()
+    # Naming every column also loads the deferred ones, which cannot be lazy-loaded here
+    await db.refresh(db_project, attribute_names=PROJECT_COLUMNS)
+    return db_project
+
+async def get_project(db: AsyncSession, project_id: str) -> ProjectSchema:
+    return (await db.execute(project_query(project_id))).scalar_one_or_none()
+
+async def get_projects(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    filters: Optional[ProjectFilter] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> List[ProjectSchema]:
+    return (await db.execute(projects_query(skip, limit, filters, dialect_name(db), fields))).scalars().all()
+
+async def get_projects_page(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    filters: Optional[ProjectFilter] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Tuple[List[ProjectSchema], Optional[str]]:
+    """Return one page of projects after the given cursor and the cursor of the next page"""
+    result = await db.execute(projects_page_query(cursor, limit, filters, dialect_name(db), fields))
+    return split_page(result.scalars().all(), limit)
+
+async def get_project_facets(db: AsyncSession, filters: Optional[ProjectFilter] = None) -> ProjectFacets:
+    """Count projects per status, category, tag and technology within the current filter"""
+    return facets_from_rows(await db.execute(facets_query(filters, dialect_name(db))))
+
+async def search_projects(db: AsyncSession, q: str, skip: int = 0, limit: int = 20) -> Tuple[int, List[ProjectSchema]]:
+    """Rank projects matching `q` and return (total hits, requested page)"""
+    if dialect_name(db) == "postgresql":
+        rows = (await db.execute(search_query(q, skip, limit))).all()
+        if rows:
+            return rows[0].total, [row[0] for row in rows]
+        return ((await db.execute(search_count_query(q))).scalar() if skip else 0), []
+
+    # The in-process index is built with the sync Session API
+    total, page_ids = await db.run_sync(fallback_page_ids, q, skip, limit)
+    if not page_ids:
+        return total, []
+    projects = (await db.execute(
+        select(ProjectModel).where(ProjectModel.id.in_(page_ids)).options(undefer_group(DETAIL_GROUP))
+    )).scalars()
+    return total, order_by_ids(projects, page_ids)
+
+async def update_project(db: AsyncSession, project_id: str, project_update: ProjectCreate) -> ProjectSchema:
+    return await patch_project(db, project_id, project_update.model_dump(exclude_unset=True))
+
+async def patch_project(
+    db: AsyncSession, project_id: str, changes: Dict, versions: Optional[List[datetime]] = None
+) -> Optional[ProjectSchema]:
+    """Apply `changes` with one UPDATE ... RETURNING.
+
+    `versions` are the updated_date values the caller's If-Match accepts.
+    Returns None when the project is missing or was changed since.
+    """
+    dialect = dialect_name(db)
+    if not changes:
+        # Nothing to write, but the precondition still applies
+        return (await db.execute(
+            project_query(project_id).where(version_condition(versions, dialect))
+        )).scalar_one_or_none()
+    project = (await db.execute(patch_project_query(project_id, changes, versions, dialect))).scalar_one_or_none()
+    await db.commit()
+    # Core statements do not fire the mapper events that keep the fallback search index current
+    if project is not None and changes.keys() & SEARCH_FIELDS.keys():
+        index_projects([project])
+    return project
+
+async def delete_project(db: AsyncSession, project_id: str, versions: Optional[List[datetime]] = None):
+    """Delete with one DELETE ... RETURNING; the (id, image_url) row, or None when missing or changed since"""
+    row = (await db.execute(delete_project_query(project_id, versions, dialect_name(db)))).first()
+    await db.commit()
+    if row is not None:
+        unindex_projects([row.id])
+    return row
+
+async def project_exists(db: AsyncSession, project_id: str) -> bool:
+    return (await db.execute(existing_ids_query([parse_project_id(project_id)]))).first() is not None
+
+async def create_projects(db: AsyncSession, projects: List[ProjectCreate]) -> List[ProjectSchema]:
+    """Insert many projects with one executemany INSERT ... RETURNING, in request order"""
+    if not projects:
+        return []
+    rows = [project_values(without_stored_image(project.model_dump())) for project in projects]
+    statement = (
+        insert(ProjectModel)
+        .returning(ProjectModel, sort_by_parameter_order=True)
+        .options(undefer_group(DETAIL_GROUP))
+    )
+    created = (await db.scalars(statement, rows)).all()
+    await db.commit()
+    return created
+
+async def update_projects(db: AsyncSession, updates: List[ProjectBatchUpdate]) -> Dict[uuid.UUID, ProjectSchema]:
+    """Apply partial updates by primary key in one transaction; returns the resulting rows by id"""
+    ids = [item.id for item in updates]
+    existing = set((await db.execute(existing_ids_query(ids))).scalars())
+    rows = [
+        project_values({"id": item.id, **item.model_dump(exclude_unset=True, exclude={"id"})})
+        for item in updates
+        if item.id in existing
+    ]
+    # ORM bulk UPDATE by primary key: one executemany per distinct set of changed columns.
+    # updated_date is stamped like every other write, so each row gets a new ETag
+    rows = [row for row in rows if len(row) > 1]
+    if rows:
+        await db.execute(update(ProjectModel).values(updated_date=version_timestamp(dialect_name(db))), rows)
+    await db.commit()
+    if not existing:
+        return {}
+    return {project.id: project for project in (await db.execute(projects_by_ids_query(list(existing)))).scalars()}
+
+async def delete_projects(db: AsyncSession, project_ids: List[uuid.UUID]) -> Dict[uuid.UUID, Optional[str]]:
+    """Delete many projects in one statement; returns the image URL of each deleted id"""
+    rows = (await db.execute(delete_projects_query(project_ids))).all()
+    await db.commit()
+    return {row.id: row.image_url for row in rows}
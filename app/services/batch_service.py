@@ -0,0 +1,80 @@
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Tuple
+import uuid
+
+from app.core.config import settings
+from app.db.schemas import BatchItemResult, BatchResult, ProjectBatchUpdate, ProjectCreate
+from app.services.async_project_service import create_projects, delete_projects, update_projects
+from app.services.cache import invalidate_project, project_cache_key, response_cache
+from app.services.search_service import index_projects, unindex_projects
+
+def _check_batch_size(count: int) -> None:
+    if count > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Too many items in batch ({count}). Maximum is {settings.BATCH_MAX_ITEMS}"
+        )
+
+def _result(items: List[BatchItemResult]) -> BatchResult:
+    failed = sum(item.status in ("not_found", "duplicate") for item in items)
+    return BatchResult(succeeded=len(items) - failed, failed=failed, items=items)
+
+def _invalidate(project_ids) -> None:
+    response_cache.delete(*(project_cache_key(str(project_id)) for project_id in project_ids))
+    invalidate_project()
+
+async def batch_create(db: AsyncSession, projects: List[ProjectCreate]) -> BatchResult:
+    """Create every project in one statement and transaction"""
+    _check_batch_size(len(projects))
+    created = await create_projects(db, projects)
+    index_projects(created)
+    invalidate_project()
+    return _result([
+        BatchItemResult(index=index, id=project.id, status="created", project=project)
+        for index, project in enumerate(created)
+    ])
+
+async def batch_update(db: AsyncSession, updates: List[ProjectBatchUpdate]) -> BatchResult:
+    """Apply partial updates to many projects in one transaction; unknown and repeated ids are reported"""
+    _check_batch_size(len(updates))
+    seen = set()
+    unique = []
+    for item in updates:
+        if item.id not in seen:
+            seen.add(item.id)
+            unique.append(item)
+    updated = await update_projects(db, unique)
+    index_projects(updated.values())
+    _invalidate(updated)
+
+    items = []
+    reported = set()
+    for index, item in enumerate(updates):
+        if item.id in reported:
+            items.append(BatchItemResult(index=index, id=item.id, status="duplicate"))
+        elif item.id in updated:
+            items.append(BatchItemResult(index=index, id=item.id, status="updated", project=updated[item.id]))
+        else:
+            items.append(BatchItemResult(index=index, id=item.id, status="not_found"))
+        reported.add(item.id)
+    return _result(items)
+
+async def batch_delete(db: AsyncSession, project_ids: List[uuid.UUID]) -> Tuple[BatchResult, List[str]]:
+    """Delete many projects in one statement; also returns the image URLs left to remove from storage"""
+    _check_batch_size(len(project_ids))
+    deleted = await delete_projects(db, list(dict.fromkeys(project_ids)))
+    unindex_projects(deleted)
+    _invalidate(deleted)
+
+    items = []
+    reported = set()
+    for index, project_id in enumerate(project_ids):
+        if project_id in reported:
+            items.append(BatchItemResult(index=index, id=project_id, status="duplicate"))
+        elif project_id in deleted:
+            items.append(BatchItemResult(index=index, id=project_id, status="deleted"))
+        else:
+            items.append(BatchItemResult(index=index, id=project_id, status="not_found"))
+        reported.add(project_id)
+    return _result(items), [image_url for image_url in deleted.values() if image_url]
@@ -0,0 +1,187 @@
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer_group
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import json
+import uuid
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal, set_statement_timeout
+from app.db.models import DETAIL_GROUP, Project as ProjectModel, ProjectStatus as ProjectStatusModel
+from app.db.schemas import ImportRowError, ProjectFilter, ProjectImport, ProjectImportReport
+from app.services.cache import invalidate_project, project_cache_key, response_cache
+from app.services.image_store import IMAGE_FIELDS, without_stored_image
+from app.services.project_service import dialect_name, filter_conditions, version_timestamp
+from app.services.search_service import search_index
+from app.services.serializers import project_serializer
+
+# Columns written by an import; created_date is only set on insert
+IMPORT_COLUMNS = [name for name in ProjectImport.model_fields if name not in ("id", "created_date")]
+# An import never changes an existing project's image: that would drop its blob
+# reference without releasing it
+UPSERT_COLUMNS = [name for name in IMPORT_COLUMNS if name not in IMAGE_FIELDS]
+# Row key of a line's own created_date; the statement falls back to the database clock
+IMPORTED_CREATED_DATE = "imported_created_date"
+
+INSERT_BUILDERS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+def export_query(filters: Optional[ProjectFilter], dialect: str):
+    # Oldest first, so rows created while the export runs land at the end
+    return (
+        select(ProjectModel)
+        .options(undefer_group(DETAIL_GROUP))
+        .where(*filter_conditions(filters, dialect))
+        .order_by(ProjectModel.created_date, ProjectModel.id)
+        .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+
+async def export_projects(filters: Optional[ProjectFilter] = None) -> AsyncIterator[bytes]:
+    """Stream projects as NDJSON, one batch of lines per chunk.
+
+    The session is owned by the generator because the response body is
+    produced after the request's dependencies have been closed. Rows come
+    from a server-side cursor in EXPORT_BATCH_SIZE partitions, so memory
+    stays flat however large the catalog is.
+    """
+    serializer = project_serializer()
+    async with AsyncSessionLocal() as db:
+        # A full export legitimately outlives DB_STATEMENT_TIMEOUT_MS
+        await set_statement_timeout(db, 0)
+        result = await db.stream(export_query(filters, dialect_name(db)))
+        async for partition in result.scalars().partitions():
+            yield b"".join(serializer.dumps(project) + b"\n" for project in partition)
+
+async def ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """Split a streamed body into (line number, line) pairs without buffering it whole"""
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > settings.IMPORT_MAX_LINE_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Line {line_number + len(lines) + 1} exceeds {settings.IMPORT_MAX_LINE_BYTES} bytes"
+            )
+        for line in lines:
+            line_number += 1
+            yield line_number, line
+    if buffer:
+        yield line_number + 1, buffer
+
+def import_row(project: ProjectImport) -> Dict:
+    row = without_stored_image(project.model_dump(include=set(IMPORT_COLUMNS)))
+    row["status"] = ProjectStatusModel(project.status.value)
+    row["id"] = project.id or uuid.uuid4()
+    row[IMPORTED_CREATED_DATE] = project.created_date
+    return row
+
+def upsert_statement(dialect: str):
+    """INSERT ... ON CONFLICT (id) DO UPDATE for every imported column but the image"""
+    if dialect not in INSERT_BUILDERS:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=f"Import is not supported on {dialect}")
+    # Versions come from the database clock like every other write, so an app
+    # host's clock skew cannot make an imported row look older than it is
+    imported_created_date = bindparam(IMPORTED_CREATED_DATE, type_=ProjectModel.created_date.type)
+    insert = INSERT_BUILDERS[dialect](ProjectModel).values(
+        created_date=func.coalesce(imported_created_date, version_timestamp(dialect)),
+        updated_date=version_timestamp(dialect),
+    )
+    updates = {name: insert.excluded[name] for name in UPSERT_COLUMNS}
+    updates["updated_date"] = version_timestamp(dialect)
+    return insert.on_conflict_do_update(index_elements=[ProjectModel.id], set_=updates)
+
+class ProjectImporter:
+    """Accumulates validated lines and writes them in IMPORT_BATCH_SIZE upserts"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.statement = upsert_statement(dialect_name(db))
+        self.report = ProjectImportReport()
+        self.written_ids: List[uuid.UUID] = []
+        self._batch: List[Tuple[int, Dict]] = []
+        self._batch_ids = set()
+
+    def reject(self, line: int, error: str, project_id: Optional[str] = None) -> None:
+        self.report.failed += 1
+        if len(self.report.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.report.errors.append(ImportRowError(line=line, id=project_id, error=error))
+
+    async def add(self, line_number: int, line: bytes) -> None:
+        if not line.strip():
+            return
+        try:
+            project = ProjectImport.model_validate_json(line)
+        except ValidationError as e:
+            self.reject(line_number, _validation_message(e), _raw_id(line))
+            return
+        row = import_row(project)
+        # One statement cannot touch the same row twice, so a repeated id starts a new batch
+        if row["id"] in self._batch_ids:
+            await self.flush()
+        self._batch.append((line_number, row))
+        self._batch_ids.add(row["id"])
+        if len(self._batch) >= settings.IMPORT_BATCH_SIZE:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Upsert the pending batch in one executemany; on failure, retry row by row to pinpoint bad lines"""
+        batch, self._batch, self._batch_ids = self._batch, [], set()
+        if not batch:
+            return
+        ids = [row["id"] for _, row in batch]
+        existing = set((await self.db.execute(select(ProjectModel.id).where(ProjectModel.id.in_(ids)))).scalars())
+        try:
+            async with self.db.begin_nested():
+                await self.db.execute(self.statement, [row for _, row in batch])
+            written = batch
+        except Exception:
+            written = []
+            for line_number, row in batch:
+                try:
+                    async with self.db.begin_nested():
+                        await self.db.execute(self.statement, [row])
+                    written.append((line_number, row))
+                except Exception as e:
+                    self.reject(line_number, str(getattr(e, "orig", e)), str(row["id"]))
+        await self.db.commit()
+        for _, row in written:
+            if row["id"] in existing:
+                self.report.updated += 1
+            else:
+                self.report.created += 1
+            self.written_ids.append(row["id"])
+
+def _raw_id(line: bytes) -> Optional[str]:
+    try:
+        value = json.loads(line).get("id")
+        return str(value) if value is not None else None
+    except Exception:
+        return None
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'line'}: {item['msg']}" for item in error.errors()
+    )
+
+async def import_projects(db: AsyncSession, chunks: AsyncIterator[bytes]) -> ProjectImportReport:
+    """Upsert an NDJSON stream of projects by id, committing every IMPORT_BATCH_SIZE rows"""
+    importer = ProjectImporter(db)
+    try:
+        async for line_number, line in ndjson_lines(chunks):
+            await importer.add(line_number, line)
+        await importer.flush()
+    finally:
+        # Bulk statements bypass ORM events, so caches and the fallback search
+        # index are refreshed here for whatever was committed
+        if importer.written_ids:
+            response_cache.delete(*(project_cache_key(str(project_id)) for project_id in importer.written_ids))
+            invalidate_project()
+            search_index.invalidate()
+    return importer.report
@@ -0,0 +1,352 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import os
+import threading
+import time
+import uuid
+
+from app.core.config import settings
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with a per-entry TTL and entry/byte limits"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                self._pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if self.max_bytes is not None and len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._size += len(value)
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._size > self.max_bytes
+            ):
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def incr(self, key: str) -> int:
+        """Increment a counter stored outside the LRU, so it is never evicted"""
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _pop(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._size -= len(value)
+
+class DiskLRUCache:
+    """Files in one directory, evicted least recently used first once they exceed max_bytes.
+
+    The index is built from the directory on first use (ordered by mtime,
+    which hits refresh), so entries survive restarts. Processes sharing the
+    directory each enforce the limit over what they know about, so treat it
+    as per process.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _load(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                if entry.name.startswith(".tmp-"):
+                    # Left behind by a write that never finished
+                    os.remove(entry.path)
+                    continue
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+            self._size += size
+        self._loaded = True
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of a cached file, or None; a hit makes it the most recently used"""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            path = self.path(key)
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                # Evicted by another process sharing the directory
+                self._size -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return path
+
+    def put(self, key: str, content: bytes) -> str:
+        """Store a file atomically, evict down to max_bytes and return its path"""
+        path = self.path(key)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+        temp_path = self.path(f".tmp-{uuid.uuid4().hex}")
+        with open(temp_path, "wb") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)
+            self._entries[key] = len(content)
+            self._size += len(content)
+            # The new file is kept even if it alone exceeds the limit, so it can be served
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                evicted, size = self._entries.popitem(last=False)
+                self._size -= size
+                self.evictions += 1
+                try:
+                    os.remove(self.path(evicted))
+                except FileNotFoundError:
+                    pass
+        return path
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "disk",
+                "directory": self.directory,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+class RedisCache:
+    """Shared cache backed by a Redis-compatible client.
+
+    Any client exposing get/set(ex=)/delete/incr works, so a local Redis,
+    a compatible server or an in-memory fake can stand in for production.
+    """
+
+    def __init__(self, client, ttl: float = 60, prefix: str = "catalog:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = self.client.get(self.prefix + key)
+        except Exception as e:
+            self._record_error(e)
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        try:
+            self.client.set(self.prefix + key, value, ex=max(1, int(self.ttl if ttl is None else ttl)))
+        except Exception as e:
+            self._record_error(e)
+
+    def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            self.client.delete(*(self.prefix + key for key in keys))
+        except Exception as e:
+            self._record_error(e)
+
+    def clear(self) -> None:
+        # Entries expire on their own; bumping generations is how lists are dropped
+        pass
+
+    def incr(self, key: str) -> Optional[int]:
+        # None rather than 0 on errors: 0 is a real generation, and entries keyed by it could be stale
+        try:
+            return int(self.client.incr(self.prefix + key))
+        except Exception as e:
+            self._record_error(e)
+            return None
+
+    def counter(self, key: str) -> Optional[int]:
+        try:
+            value = self.client.get(self.prefix + key)
+        except Exception as e:
+            self._record_error(e)
+            return None
+        return int(value) if value is not None else 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "redis",
+                "hits": self.hits,
+                "misses": self.misses,
+                # Redis evicts on its own; see `evicted_keys` in INFO stats
+                "evictions": None,
+                "errors": self.errors,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _record_error(self, error: Exception) -> None:
+        with self._lock:
+            self.errors += 1
+        print(f"Cache backend error: {str(error)}")
+
+class NullCache:
+    """Cache that stores nothing, used when caching is disabled"""
+
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        pass
+
+    def delete(self, *keys: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def incr(self, key: str) -> int:
+        return 0
+
+    def counter(self, key: str) -> int:
+        return 0
+
+    def stats(self) -> dict:
+        return {"backend": "disabled"}
+
+def create_cache():
+    """Build the response cache backend selected by settings"""
+    if not settings.CACHE_ENABLED:
+        return NullCache()
+    if settings.CACHE_REDIS_URL:
+        try:
+            import redis
+            client = redis.Redis.from_url(settings.CACHE_REDIS_URL)
+            return RedisCache(client, ttl=settings.CACHE_TTL_SECONDS)
+        except ImportError:
+            print("Warning: CACHE_REDIS_URL is set but the redis package is not installed. Using in-process cache.")
+    return LRUCache(
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        ttl=settings.CACHE_TTL_SECONDS,
+        max_bytes=settings.CACHE_MAX_BYTES,
+    )
+
+# Bumped on every catalog write; list entries are keyed by it, so one
+# increment retires every cached listing at once
+LIST_GENERATION_KEY = "projects:generation"
+
+response_cache = create_cache()
+
+def project_cache_key(project_id: str) -> str:
+    return f"project:{project_id}"
+
+def catalog_generation() -> Optional[int]:
+    """The list generation, or None when the backend cannot tell and the cache must be bypassed"""
+    return response_cache.counter(LIST_GENERATION_KEY)
+
+def list_cache_key(fingerprint: str) -> Optional[str]:
+    generation = catalog_generation()
+    if generation is None:
+        return None
+    return f"projects:{generation}:{fingerprint}"
+
+def cache_if_current(key: str, value: bytes, generation: Optional[int]) -> None:
+    """Cache a result read after `generation` unless a catalog write has landed since.
+
+    That write's invalidation may already have run, so caching the result
+    could keep the pre-write row until the TTL.
+    """
+    if generation is not None and catalog_generation() == generation:
+        response_cache.set(key, value)
+
+def invalidate_project(project_id: Optional[str] = None) -> None:
+    """Drop the cached entry of one project and every cached listing"""
+    # Bumped before the delete, so a reader that checked the generation in
+    # between still has its entry removed by the delete
+    response_cache.incr(LIST_GENERATION_KEY)
+    if project_id is not None:
+        response_cache.delete(project_cache_key(str(project_id)))
@@ -0,0 +1,275 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Set
+import asyncio
+import os
+import uuid
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.db.models import ImageJob as ImageJobModel, ImageJobStatus, Project as ProjectModel
+from app.services.cache import invalidate_project
+from app.services.project_service import dialect_name, parse_project_id, version_timestamp
+from app.services.storage import get_storage
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _write_staged(path: str, content: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
+def _read_staged(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+def _remove_staged(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+async def enqueue_image_job(
+    db: AsyncSession, project_id: str, image_data: bytes, filename: Optional[str] = None
+) -> ImageJobModel:
+    """Stage validated upload bytes on disk and queue them for background processing"""
+    staged_path = os.path.join(settings.IMAGE_JOBS_STAGING_DIR, f"{uuid.uuid4()}.upload")
+    await asyncio.to_thread(_write_staged, staged_path, image_data)
+    job = ImageJobModel(
+        project_id=parse_project_id(str(project_id)),
+        staged_path=staged_path,
+        original_filename=filename,
+        max_attempts=settings.IMAGE_JOBS_MAX_ATTEMPTS,
+        run_after=utcnow(),
+    )
+    db.add(job)
+    try:
+        await db.commit()
+    except Exception:
+        await asyncio.to_thread(_remove_staged, staged_path)
+        raise
+    await db.refresh(job)
+    image_job_worker.notify()
+    return job
+
+async def get_image_job(db: AsyncSession, job_id: str) -> Optional[ImageJobModel]:
+    try:
+        return await db.get(ImageJobModel, uuid.UUID(str(job_id)))
+    except ValueError:
+        return None
+
+async def get_image_jobs(
+    db: AsyncSession, job_status: Optional[ImageJobStatus] = None, limit: int = 100
+) -> List[ImageJobModel]:
+    query = select(ImageJobModel).order_by(ImageJobModel.created_date.desc(), ImageJobModel.id.desc()).limit(limit)
+    if job_status is not None:
+        query = query.where(ImageJobModel.status == job_status)
+    return (await db.execute(query)).scalars().all()
+
+async def retry_image_job(db: AsyncSession, job_id: str) -> Optional[ImageJobModel]:
+    """Move a dead-lettered job back onto the queue with a fresh set of attempts"""
+    job = await get_image_job(db, job_id)
+    if job is None:
+        return None
+    if job.status != ImageJobStatus.dead:
+        raise HTTPException(status_code=409, detail=f"Only dead jobs can be retried (job is {job.status.value})")
+    if not await asyncio.to_thread(os.path.exists, job.staged_path):
+        raise HTTPException(status_code=410, detail="The staged upload of this job no longer exists")
+    job.status = ImageJobStatus.queued
+    job.attempts = 0
+    job.run_after = utcnow()
+    job.locked_at = None
+    await db.commit()
+    await db.refresh(job)
+    image_job_worker.notify()
+    return job
+
+def _due_condition(now: datetime):
+    lease_expired = now - timedelta(seconds=settings.IMAGE_JOBS_LEASE_SECONDS)
+    return or_(
+        and_(ImageJobModel.status == ImageJobStatus.queued, ImageJobModel.run_after <= now),
+        # A worker that died mid-job leaves it running; its lease expires and it is picked up again
+        and_(ImageJobModel.status == ImageJobStatus.running, ImageJobModel.locked_at < lease_expired),
+    )
+
+async def claim_image_job(db: AsyncSession) -> Optional[uuid.UUID]:
+    """Atomically take the oldest due job, counting the attempt up front"""
+    now = utcnow()
+    due = _due_condition(now)
+    query = select(ImageJobModel.id).where(due).order_by(ImageJobModel.run_after).limit(1)
+    if dialect_name(db) == "postgresql":
+        # Concurrent workers skip rows another worker is claiming instead of queueing behind it
+        query = query.with_for_update(skip_locked=True)
+    job_id = (await db.execute(query)).scalar()
+    if job_id is None:
+        await db.rollback()
+        return None
+    # Re-checking `due` keeps the claim safe where SKIP LOCKED is unavailable
+    result = await db.execute(
+        update(ImageJobModel)
+        .where(ImageJobModel.id == job_id, due)
+        .values(status=ImageJobStatus.running, locked_at=now, attempts=ImageJobModel.attempts + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return job_id if result.rowcount == 1 else None
+
+def _is_retryable(error: Exception) -> bool:
+    # Client errors (undecodable or oversized images) fail the same way every time;
+    # capacity, timeout and storage errors are worth another attempt
+    if isinstance(error, HTTPException):
+        return error.status_code >= 500 or error.status_code in (408, 429)
+    # The staged upload is gone, so there is nothing left to process
+    return not isinstance(error, FileNotFoundError)
+
+async def _fail_job(db: AsyncSession, job: ImageJobModel, error: Exception) -> None:
+    job.last_error = error.detail if isinstance(error, HTTPException) else str(error)
+    job.locked_at = None
+    if _is_retryable(error) and job.attempts < job.max_attempts:
+        job.status = ImageJobStatus.queued
+        job.run_after = utcnow() + timedelta(
+            seconds=settings.IMAGE_JOBS_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+        )
+        print(f"Image job {job.id} failed (attempt {job.attempts}/{job.max_attempts}), retrying: {job.last_error}")
+    else:
+        # Dead-lettered; the staged upload is kept so the job can be retried manually
+        job.status = ImageJobStatus.dead
+        print(f"Image job {job.id} failed permanently after {job.attempts} attempt(s): {job.last_error}")
+    await db.commit()
+
+async def run_image_job(job_id: uuid.UUID) -> None:
+    """Process one claimed job: render and store the variants, then point the project at them"""
+    async with AsyncSessionLocal() as db:
+        job = await db.get(ImageJobModel, job_id)
+        if job is None:
+            return
+        project = await db.get(ProjectModel, job.project_id)
+        if project is None:
+            job.status = ImageJobStatus.dead
+            job.last_error = "Project no longer exists"
+            job.locked_at = None
+            await db.commit()
+            await asyncio.to_thread(_remove_staged, job.staged_path)
+            return
+
+        try:
+            image_data = await asyncio.to_thread(_read_staged, job.staged_path)
+            stored = await get_storage().store_image(image_data, str(job.project_id), job.original_filename)
+        except Exception as e:
+            await _fail_job(db, job, e)
+            return
+
+        previous_url = project.image_url
+        try:
+            # Only while this claim still holds: once the lease expired another
+            # worker may have taken (or finished) the job
+            finished = await db.execute(
+                update(ImageJobModel)
+                .where(
+                    ImageJobModel.id == job.id,
+                    ImageJobModel.status == ImageJobStatus.running,
+                    ImageJobModel.attempts == job.attempts,
+                )
+                .values(status=ImageJobStatus.succeeded, image_url=stored.url, last_error=None, locked_at=None)
+                .execution_options(synchronize_session=False)
+            )
+            if finished.rowcount == 1:
+                await db.execute(
+                    update(ProjectModel)
+                    .where(ProjectModel.id == project.id)
+                    .values(
+                        image_url=stored.url,
+                        image_variants=stored.variants,
+                        updated_date=version_timestamp(dialect_name(db)),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            # Nothing points at the reference store_image took, so it is given back
+            await get_storage().delete_image(stored.url)
+            raise
+        if finished.rowcount != 1:
+            print(f"Image job {job.id} lost its lease to another worker; discarding this result")
+            await get_storage().delete_image(stored.url)
+            return
+
+    await asyncio.to_thread(_remove_staged, job.staged_path)
+    invalidate_project(job.project_id)
+    # Even an identical URL holds its own reference, taken by store_image
+    if previous_url:
+        await get_storage().delete_image(previous_url)
+
+class ImageJobWorker:
+    """Polls the image_jobs table and runs up to `concurrency` jobs at a time.
+
+    Runs inside the API process (started from the lifespan) or on its own
+    via `python -m app.worker`; any number of workers can share one queue.
+    """
+
+    def __init__(self, concurrency: int = 2, poll_interval: float = 1):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    def notify(self) -> None:
+        """Skip the rest of the poll interval, e.g. right after a job is queued in this process"""
+        self._wakeup.set()
+
+    def start(self) -> None:
+        self._stopping = False
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop claiming jobs and wait for the running ones to finish"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def run(self) -> None:
+        slots = asyncio.Semaphore(self.concurrency)
+        while not self._stopping:
+            await slots.acquire()
+            try:
+                async with AsyncSessionLocal() as db:
+                    job_id = await claim_image_job(db)
+            except Exception as e:
+                print(f"Image job worker could not poll the queue: {str(e)}")
+                job_id = None
+            if job_id is None:
+                slots.release()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.create_task(self._run_job(job_id, slots))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+        if self._running:
+            await asyncio.gather(*self._running)
+
+    async def _run_job(self, job_id: uuid.UUID, slots: asyncio.Semaphore) -> None:
+        try:
+            await run_image_job(job_id)
+        except Exception as e:
+            # The job stays running and is picked up again once its lease expires
+            print(f"Image job {job_id} crashed: {str(e)}")
+        finally:
+            slots.release()
+
+# Create a singleton instance
+image_job_worker = ImageJobWorker(
+    concurrency=settings.IMAGE_JOBS_CONCURRENCY,
+    poll_interval=settings.IMAGE_JOBS_POLL_SECONDS,
+)
@@ -0,0 +1,112 @@
+from fastapi import HTTPException
+from typing import Dict, Optional
+import asyncio
+import hashlib
+
+from app.core.config import settings
+from app.services.cache import DiskLRUCache
+from app.services.image_service import VARIANT_FORMATS, image_processor, resize_to_width
+from app.services.metrics import Timer, image_stage_duration
+from app.services.storage import get_storage
+
+# Only content-addressed blobs: their bytes never change under a key, which the
+# digest, ETag and immutable Cache-Control rely on. Legacy projects/ keys can be
+# overwritten in place and are served only as their stored variants.
+RESIZABLE_ROOTS = ("images/",)
+
+# Bump when resize_to_width changes its output, so old cache entries and ETags retire
+RESIZE_VERSION = 1
+
+class ResizeRequest:
+    """One on-demand variant: a stored source image at a width, format and quality"""
+
+    def __init__(self, key: str, width: int, image_format: str, quality: Optional[int] = None):
+        if not key.startswith(RESIZABLE_ROOTS) or ".." in key.split("/"):
+            raise HTTPException(status_code=404, detail="Image not found")
+        if width < 1 or width > settings.IMAGE_RESIZE_MAX_WIDTH:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Width must be between 1 and {settings.IMAGE_RESIZE_MAX_WIDTH}"
+            )
+        if image_format not in settings.IMAGE_RESIZE_FORMATS or image_format not in VARIANT_FORMATS:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Invalid format. Allowed formats: {', '.join(settings.IMAGE_RESIZE_FORMATS)}"
+            )
+        # Formats without a quality setting ignore it, so it must not split their cache entries
+        if "quality" not in VARIANT_FORMATS[image_format][2]:
+            quality = None
+        self.key = key
+        self.width = width
+        self.image_format = image_format
+        self.quality = quality
+
+    @property
+    def content_type(self) -> str:
+        return VARIANT_FORMATS[self.image_format][1]
+
+    @property
+    def digest(self) -> str:
+        """Identifies the rendered bytes; sources are content addressed, so it never goes stale"""
+        params = f"{RESIZE_VERSION}|{self.key}|{self.width}|{self.image_format}|{self.quality}"
+        return hashlib.sha256(params.encode()).hexdigest()
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.digest}.{VARIANT_FORMATS[self.image_format][0]}"
+
+    @property
+    def etag(self) -> str:
+        return f'"r-{self.digest[:32]}"'
+
+class ImageResizer:
+    """Renders variants on first request into a disk cache.
+
+    Concurrent misses for the same variant share one fetch-and-render job
+    instead of each reading the source and occupying a processing slot.
+    """
+
+    def __init__(self, cache: DiskLRUCache):
+        self.cache = cache
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.renders = 0
+        self.coalesced = 0
+
+    async def get(self, request: ResizeRequest) -> str:
+        """Path of the cached variant, rendering it first if needed"""
+        # A stat and utime; cheaper than a thread hop on the hot path
+        path = self.cache.get(request.cache_key)
+        if path is not None:
+            return path
+        job = self._inflight.get(request.cache_key)
+        if job is None:
+            job = asyncio.ensure_future(self._render(request))
+            self._inflight[request.cache_key] = job
+            job.add_done_callback(lambda done: self._forget(request.cache_key, done))
+        else:
+            self.coalesced += 1
+        # A client that disconnects must not cancel the job others are waiting on
+        return await asyncio.shield(job)
+
+    def _forget(self, cache_key: str, job: asyncio.Future) -> None:
+        self._inflight.pop(cache_key, None)
+        if not job.cancelled():
+            # Marks a failure as retrieved even if every waiter went away
+            job.exception()
+
+    async def _render(self, request: ResizeRequest) -> str:
+        source = await get_storage().read_object(request.key)
+        if source is None:
+            raise HTTPException(status_code=404, detail="Image not found")
+        with Timer(image_stage_duration, stage="resize_on_demand"):
+            content = await image_processor.run(
+                resize_to_width, source, request.width, request.image_format, request.quality
+            )
+        self.renders += 1
+        return await asyncio.to_thread(self.cache.put, request.cache_key, content)
+
+    def stats(self) -> dict:
+        return {**self.cache.stats(), "renders": self.renders, "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+# Create a singleton instance; the cache directory is only touched on first use
+image_resizer = ImageResizer(DiskLRUCache(settings.IMAGE_RESIZE_CACHE_DIR, settings.IMAGE_RESIZE_CACHE_MAX_BYTES))
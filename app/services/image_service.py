@@ -0,0 +1,308 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException, UploadFile
+from functools import partial
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+import asyncio
+import hashlib
+import io
+import json
+import threading
+import time
+
+from app.core.config import settings
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Leading bytes of each accepted format; the declared content type is not trusted
+IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """Detect the image content type from its magic bytes"""
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return content_type
+    return None
+
+def check_image_dimensions(image_data: bytes) -> None:
+    """Reject decompression bombs from the header alone, before any pixels are decoded"""
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(image_data)) as image:
+            width, height = image.size
+    except Exception as e:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Error processing image: {str(e)}"
+        )
+    if width * height > settings.MAX_IMAGE_PIXELS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Image dimensions too large ({width}x{height}). "
+                   f"Maximum is {settings.MAX_IMAGE_PIXELS} pixels"
+        )
+
+async def read_image_upload(file: UploadFile) -> bytes:
+    """Read an upload in chunks, enforcing MAX_FILE_SIZE and the real image format as it streams"""
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size is {settings.MAX_FILE_SIZE / (1024*1024):.1f}MB"
+    )
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE:
+        raise too_large
+
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+        if len(buffer) > settings.MAX_FILE_SIZE:
+            raise too_large
+        if len(buffer) == len(chunk):
+            content_type = sniff_image_type(bytes(buffer[:16]))
+            if content_type not in settings.ALLOWED_IMAGE_TYPES:
+                raise HTTPException(
+                    status_code=415,
+                    detail=f"Invalid file type. Allowed types: {', '.join(settings.ALLOWED_IMAGE_TYPES)}"
+                )
+    if not buffer:
+        raise HTTPException(status_code=422, detail="Empty image file")
+
+    image_data = bytes(buffer)
+    check_image_dimensions(image_data)
+    return image_data
+
+def _decode_rgb(image_data: bytes, max_size: tuple) -> "Image.Image":
+    """Decode an image as RGB, at reduced scale where the format allows it"""
+    from PIL import Image
+
+    Image.MAX_IMAGE_PIXELS = settings.MAX_IMAGE_PIXELS
+    image = Image.open(io.BytesIO(image_data))
+
+    # JPEG can be decoded directly at 1/2, 1/4 or 1/8 scale; draft picks the
+    # smallest scale that still covers max_size, so the full-resolution
+    # bitmap is never materialized
+    if image.format == 'JPEG':
+        image.draft('RGB', max_size)
+
+    # Convert RGBA to RGB if necessary
+    if image.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
+        image = background
+    return image
+
+def resize_image(image_data: bytes, max_size: tuple = (1024, 1024)) -> bytes:
+    """Resize image to maximum dimensions while maintaining aspect ratio.
+
+    Pure CPU work with picklable arguments, so it can run in a worker process.
+    """
+    from PIL import Image
+
+    image = _decode_rgb(image_data, max_size)
+
+    # Resize image
+    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+    # Save to bytes
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=85, optimize=True)
+    return output.getvalue()
+
+# Encoder settings and file extension per variant format
+VARIANT_FORMATS = {
+    "jpeg": ("jpg", "image/jpeg", {"format": "JPEG", "quality": 85, "optimize": True, "progressive": True}),
+    "webp": ("webp", "image/webp", {"format": "WEBP", "quality": 80, "method": 4}),
+    "png": ("png", "image/png", {"format": "PNG", "optimize": True}),
+}
+
+def variant_filename(size: int, image_format: str) -> str:
+    return f"{size}.{VARIANT_FORMATS[image_format][0]}"
+
+def render_variants_timed(
+    image_data: bytes, sizes: List[int], formats: List[str]
+) -> Tuple[List[Tuple[int, int, str, bytes]], Dict[str, float]]:
+    """Produce every (size, format) variant of an image from a single decode.
+
+    Each size is a bounding box like resize_image's max_size. Variants are
+    derived from largest to smallest, each from the previous one, and sizes
+    the source is too small to fill are skipped. Returns a list of
+    (size, actual width, format, encoded bytes), plus the seconds spent
+    decoding, resizing and encoding, which are measured here because this
+    runs in a worker process.
+    """
+    from PIL import Image
+
+    timings = {"decode": 0.0, "resize": 0.0, "encode": 0.0}
+    sizes = sorted(set(sizes), reverse=True)
+    started = time.perf_counter()
+    image = _decode_rgb(image_data, (sizes[0], sizes[0]))
+    image.load()
+    timings["decode"] = time.perf_counter() - started
+    variants = []
+    previous_width = None
+    for size in sizes:
+        started = time.perf_counter()
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        timings["resize"] += time.perf_counter() - started
+        # A source smaller than several boxes would yield identical variants
+        if image.width == previous_width:
+            continue
+        previous_width = image.width
+        for image_format in formats:
+            started = time.perf_counter()
+            output = io.BytesIO()
+            image.save(output, **VARIANT_FORMATS[image_format][2])
+            timings["encode"] += time.perf_counter() - started
+            variants.append((size, image.width, image_format, output.getvalue()))
+    return variants, timings
+
+def render_variants(image_data: bytes, sizes: List[int], formats: List[str]) -> List[Tuple[int, int, str, bytes]]:
+    """render_variants_timed without the timings"""
+    return render_variants_timed(image_data, sizes, formats)[0]
+
+def resize_to_width(image_data: bytes, width: int, image_format: str, quality: Optional[int] = None) -> bytes:
+    """Scale an image down to `width` pixels wide (never up) and encode it as `image_format`.
+
+    `quality` overrides the format's default where the encoder has one.
+    Runs in the processing pool like render_variants.
+    """
+    from PIL import Image
+
+    # Only the width is constrained, so draft may shrink JPEGs as far as that allows
+    image = _decode_rgb(image_data, (width, 1))
+    if image.width > width:
+        image.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+    options = dict(VARIANT_FORMATS[image_format][2])
+    if quality is not None and "quality" in options:
+        options["quality"] = quality
+    output = io.BytesIO()
+    image.save(output, **options)
+    return output.getvalue()
+
+def variant_params_digest(sizes: List[int], formats: List[str]) -> str:
+    """Short digest of everything besides the source that determines the rendered variants"""
+    params = {
+        "sizes": sorted(set(sizes), reverse=True),
+        "formats": {image_format: VARIANT_FORMATS[image_format][2] for image_format in formats},
+    }
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+def content_prefix(image_data: bytes, sizes: List[int], formats: List[str]) -> str:
+    """Content-addressed storage prefix: images/{source sha256}/{params digest}"""
+    return f"images/{hashlib.sha256(image_data).hexdigest()}/{variant_params_digest(sizes, formats)}"
+
+class StoredImage(NamedTuple):
+    # URL of the largest JPEG variant, kept as Project.image_url
+    url: str
+    # {format: {actual width: url}}, stored as Project.image_variants
+    variants: Dict[str, Dict[str, str]]
+
+def stored_image(base_url: str, prefix: str, rendered: List[Tuple[int, int, str, bytes]]) -> StoredImage:
+    """Describe uploaded variants stored under {base_url}/{prefix}/{size}.{ext}"""
+    variants: Dict[str, Dict[str, str]] = {}
+    for size, width, image_format, _ in rendered:
+        variants.setdefault(image_format, {})[str(width)] = f"{base_url}/{prefix}/{variant_filename(size, image_format)}"
+    size, _, image_format, _ = next(
+        (variant for variant in rendered if variant[2] == "jpeg"), rendered[0]
+    )
+    return StoredImage(url=f"{base_url}/{prefix}/{variant_filename(size, image_format)}", variants=variants)
+
+def variant_content_type(image_format: str) -> str:
+    return VARIANT_FORMATS[image_format][1]
+
+class ImageProcessor:
+    """Runs image CPU work off the event loop in a process (or thread) pool.
+
+    The number of jobs queued or running is bounded, and each job has a
+    timeout, so a burst of large uploads degrades into fast 503s instead of
+    an ever-growing backlog.
+    """
+
+    def __init__(
+        self,
+        mode: str = "process",
+        workers: Optional[int] = None,
+        max_queue: int = 32,
+        timeout: float = 30,
+    ):
+        if mode not in ("process", "thread"):
+            raise ValueError(f"Unknown image worker mode: {mode}")
+        self.mode = mode
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="image")
+            return self._executor
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run func(*args, **kwargs) in the pool and await its result"""
+        with self._lock:
+            if self._pending >= self.max_queue:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Image processing is at capacity. Please retry shortly."
+                )
+            self._pending += 1
+        try:
+            job = self._get_executor().submit(partial(func, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # The slot is freed when the work itself finishes: a caller that times
+        # out stops waiting, but a job already running keeps its worker busy
+        job.add_done_callback(lambda _: self._release())
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Image processing timed out")
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Error processing image: {str(e)}"
+            )
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work and release the pool; called from the app lifespan"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+# Create a singleton instance
+image_processor = ImageProcessor(
+    mode=settings.IMAGE_WORKER_MODE,
+    workers=settings.IMAGE_WORKERS,
+    max_queue=settings.IMAGE_MAX_QUEUE,
+    timeout=settings.IMAGE_JOB_TIMEOUT_SECONDS,
+)
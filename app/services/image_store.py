@@ -0,0 +1,105 @@
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from typing import Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.db.models import ImageBlob
+from app.services.image_service import StoredImage
+
+# Keys under this prefix are content-addressed and reference counted
+BLOB_ROOT = "images/"
+
+# Project columns only an upload may set, since it owns the storage they point at
+IMAGE_FIELDS = ("image_path", "image_url", "image_variants")
+
+def blob_prefix_of(key: str) -> Optional[str]:
+    """Blob prefix of a storage key such as images/{sha}/{params}/480.webp"""
+    parts = key.split("/")
+    if len(parts) == 4 and key.startswith(BLOB_ROOT):
+        return "/".join(parts[:3])
+    return None
+
+def is_stored_url(url: Optional[str]) -> bool:
+    """Whether a URL points into this app's storage rather than somewhere external"""
+    return bool(url) and url.startswith(f"{settings.S3_BASE_URL}/")
+
+def without_stored_image(values: dict) -> dict:
+    """Drop a client-supplied image that points into storage.
+
+    Only an upload takes the blob reference (or owns the legacy key) that a
+    later delete gives back, so a copied URL would release someone else's image.
+    """
+    if is_stored_url(values.get("image_url")):
+        values.update(image_url=None, image_path=None, image_variants={})
+    return values
+
+async def acquire_blob(prefix: str) -> Optional[StoredImage]:
+    """Take a reference on already-processed variants, if this source was stored before"""
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            update(ImageBlob)
+            .where(ImageBlob.prefix == prefix)
+            .values(refcount=ImageBlob.refcount + 1)
+            .returning(ImageBlob.image_url, ImageBlob.image_variants)
+        )).first()
+        await db.commit()
+    if row is None:
+        return None
+    return StoredImage(url=row.image_url, variants=row.image_variants or {})
+
+async def register_blob(
+    prefix: str, stored: StoredImage, restore_objects: Callable[[], Awaitable[None]]
+) -> StoredImage:
+    """Record freshly uploaded variants with one reference.
+
+    When a concurrent upload of the same source registered first, the
+    objects just written are byte-identical, so its row is referenced instead.
+    A last release of the same source may have been deleting the objects
+    while these were written; it keeps its row until storage is done, so once
+    our insert lands `restore_objects` writes back whatever it removed.
+    """
+    while True:
+        async with AsyncSessionLocal() as db:
+            db.add(ImageBlob(prefix=prefix, image_url=stored.url, image_variants=stored.variants, refcount=1))
+            try:
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()
+            else:
+                await restore_objects()
+                return stored
+        existing = await acquire_blob(prefix)
+        if existing is not None:
+            return existing
+        # Released and deleted between our insert and acquire: register again
+
+async def release_blob(prefix: str, delete_objects: Callable[[], Awaitable[bool]]) -> bool:
+    """Drop one reference, deleting the objects with `delete_objects` when it was the last.
+
+    The row stays locked by the decrement until storage deletion finishes,
+    so an upload of the same source waits for it instead of referencing
+    objects that are about to disappear. Returns whether the image is gone
+    from this project's point of view: the reference dropped or the objects deleted.
+    """
+    async with AsyncSessionLocal() as db:
+        refcount = (await db.execute(
+            update(ImageBlob)
+            .where(ImageBlob.prefix == prefix, ImageBlob.refcount > 0)
+            .values(refcount=ImageBlob.refcount - 1)
+            .returning(ImageBlob.refcount)
+        )).scalar()
+        if refcount is None:
+            # Not registered: nothing else points at it
+            await db.commit()
+            return await delete_objects()
+        if refcount > 0:
+            await db.commit()
+            return True
+        try:
+            deleted = await delete_objects()
+        finally:
+            # Objects a failed delete leaves behind are unreferenced; app.reconcile removes them
+            await db.execute(delete(ImageBlob).where(ImageBlob.prefix == prefix))
+            await db.commit()
+        return deleted
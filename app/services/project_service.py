@@ -1,8 +1,279 @@
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import HTTPException, status
+from sqlalchemy import String, and_, cast, delete, false, func, literal, or_, select, true, tuple_, union_all, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session, load_only, undefer_group
+from sqlalchemy.sql import Select
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import base64
+import json
+import uuid
 
-from app.db.models import Project as ProjectModel
-from app.db.schemas import ProjectCreate, Project as ProjectSchema
+from app.db.models import DETAIL_GROUP, Project as ProjectModel, ProjectStatus as ProjectStatusModel
+from app.db.schemas import ProjectCreate, ProjectFacets, ProjectFilter, Project as ProjectSchema, ProjectSummary
+
+FACET_ARRAY_COLUMNS = ("tags", "tech_stack")
+
+PROJECT_COLUMNS = [column.key for column in ProjectModel.__table__.columns]
+
+# Default projection of list endpoints
+SUMMARY_FIELDS = tuple(sorted(set(ProjectSummary.model_fields) | set(ProjectSummary.model_computed_fields)))
+
+# Everything `fields=` may name: the stored columns plus computed fields
+PROJECT_FIELDS = frozenset(ProjectSchema.model_fields) | frozenset(ProjectSchema.model_computed_fields)
+
+# Always loaded, since ETags and cursors are derived from them
+KEY_FIELDS = ("id", "created_date", "updated_date")
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a `fields=` value: None (all fields) for "*", the summary fields when absent"""
+    if fields is None or not fields.strip():
+        return SUMMARY_FIELDS
+    if fields.strip() == "*":
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - PROJECT_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(sorted(PROJECT_FIELDS))}"
+        )
+    return tuple(sorted(requested | {"id"}))
+
+def fields_options(fields: Optional[Tuple[str, ...]]) -> list:
+    """Loader options selecting only the columns behind `fields` (None loads every column)"""
+    if fields is None:
+        return [undefer_group(DETAIL_GROUP)]
+    names = set(fields) | set(KEY_FIELDS)
+    if "image_srcset" in names:
+        names.add("image_variants")
+    return [load_only(*(getattr(ProjectModel, name) for name in PROJECT_COLUMNS if name in names))]
+
+def encode_cursor(project: ProjectModel) -> str:
+    """Encode the (created_date, id) sort key of a project as an opaque cursor"""
+    payload = json.dumps([project.created_date.isoformat(), str(project.id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Decode a cursor produced by encode_cursor back into its sort key"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_date, project_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_date), uuid.UUID(project_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def parse_project_id(project_id) -> uuid.UUID:
+    """Coerce a path parameter into a UUID; malformed ids can never match a project"""
+    if isinstance(project_id, uuid.UUID):
+        return project_id
+    try:
+        return uuid.UUID(str(project_id))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+def _json_array_contains(column, value: str, dialect: str):
+    """Condition matching rows whose JSON array `column` contains `value`"""
+    if dialect == "postgresql":
+        # @> is served by the jsonb_path_ops GIN index
+        return column.op("@>")(literal([value], JSONB))
+    elements = func.json_each(column).table_valued("value")
+    return select(1).select_from(elements).where(elements.c.value == value).exists()
+
+def _json_array_elements(column, dialect: str):
+    """Table-valued expansion of a JSON array column into a `value` column"""
+    if dialect == "postgresql":
+        return func.jsonb_array_elements_text(column).table_valued("value")
+    return func.json_each(column).table_valued("value")
+
+def filter_conditions(filters: Optional[ProjectFilter], dialect: str) -> list:
+    """Translate a ProjectFilter into SQL conditions to be AND-ed together"""
+    if filters is None:
+        return []
+    conditions = []
+    for name in FACET_ARRAY_COLUMNS:
+        values = getattr(filters, name)
+        if not values:
+            continue
+        column = getattr(ProjectModel, name)
+        if filters.match == "all" and dialect == "postgresql":
+            conditions.append(column.op("@>")(literal(values, JSONB)))
+            continue
+        matches = [_json_array_contains(column, value, dialect) for value in values]
+        conditions.append(and_(*matches) if filters.match == "all" else or_(*matches))
+    if filters.status:
+        conditions.append(ProjectModel.status.in_([ProjectStatusModel(s.value) for s in filters.status]))
+    if filters.category:
+        conditions.append(ProjectModel.category.in_(filters.category))
+    return conditions
+
+def dialect_name(db) -> str:
+    return db.get_bind().dialect.name
+
+# Statement builders shared by this module and its async counterpart in
+# app/services/async_project_service.py
+
+def project_values(data: Dict) -> Dict:
+    """Column values for a Core insert/update from a schema dump, with the status mapped onto the model enum"""
+    if data.get("status") is not None:
+        data["status"] = ProjectStatusModel(getattr(data["status"], "value", data["status"]))
+    return data
+
+def existing_ids_query(project_ids: List[uuid.UUID]) -> Select:
+    return select(ProjectModel.id).where(ProjectModel.id.in_(project_ids))
+
+def projects_by_ids_query(project_ids: List[uuid.UUID]) -> Select:
+    # Fresh values even if the session already holds some of these rows
+    return (
+        select(ProjectModel)
+        .where(ProjectModel.id.in_(project_ids))
+        .options(undefer_group(DETAIL_GROUP))
+        .execution_options(populate_existing=True)
+    )
+
+def delete_projects_query(project_ids: List[uuid.UUID]):
+    """Single DELETE handing back what storage cleanup needs"""
+    return (
+        delete(ProjectModel)
+        .where(ProjectModel.id.in_(project_ids))
+        .returning(ProjectModel.id, ProjectModel.image_url)
+        .execution_options(synchronize_session=False)
+    )
+
+def version_timestamp(dialect: str):
+    """SQL expression for the updated_date of a write, which must change the project's ETag"""
+    if dialect == "sqlite":
+        # CURRENT_TIMESTAMP has whole seconds on SQLite, so two edits within a second
+        # would share an ETag; this is the same UTC clock to the millisecond, written
+        # in the six-digit fraction SQLAlchemy parses
+        return func.strftime("%Y-%m-%d %H:%M:%f000", "now")
+    return func.current_timestamp()
+
+def version_condition(versions: Optional[List[datetime]], dialect: str):
+    """Project is still at one of the updated_date values its If-Match ETags were issued for"""
+    if versions is None:
+        return true()
+    if not versions:
+        return false()
+    if dialect == "sqlite":
+        # Stored text may or may not carry a fraction; julianday compares instants (to the millisecond)
+        column_type = ProjectModel.updated_date.type
+        return func.julianday(ProjectModel.updated_date).in_(
+            [func.julianday(literal(version, column_type)) for version in versions]
+        )
+    return ProjectModel.updated_date.in_(versions)
+
+def patch_project_query(project_id, values: Dict, versions: Optional[List[datetime]], dialect: str):
+    """Single UPDATE of the given columns handing back the whole updated row"""
+    return (
+        update(ProjectModel)
+        .where(ProjectModel.id == parse_project_id(project_id), version_condition(versions, dialect))
+        .values(**project_values(values), updated_date=version_timestamp(dialect))
+        .returning(ProjectModel)
+        .options(undefer_group(DETAIL_GROUP))
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+def delete_project_query(project_id, versions: Optional[List[datetime]], dialect: str):
+    """Single DELETE handing back what storage cleanup needs"""
+    return (
+        delete(ProjectModel)
+        .where(ProjectModel.id == parse_project_id(project_id), version_condition(versions, dialect))
+        .returning(ProjectModel.id, ProjectModel.image_url)
+        .execution_options(synchronize_session=False)
+    )
+
+def project_query(project_id) -> Select:
+    return (
+        select(ProjectModel)
+        .where(ProjectModel.id == parse_project_id(project_id))
+        .options(undefer_group(DETAIL_GROUP))
+    )
+
+def projects_query(
+    skip: int, limit: int, filters: Optional[ProjectFilter], dialect: str, fields: Optional[Tuple[str, ...]] = None
+) -> Select:
+    # Newest first, with id as a tie-breaker so the order is stable between requests
+    return (
+        select(ProjectModel)
+        .options(*fields_options(fields))
+        .where(*filter_conditions(filters, dialect))
+        .order_by(ProjectModel.created_date.desc(), ProjectModel.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+
+def projects_page_query(
+    cursor: Optional[str],
+    limit: int,
+    filters: Optional[ProjectFilter],
+    dialect: str,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Select:
+    """Keyset query over (created_date, id), served by ix_projects_created_date_id.
+
+    Every page is a single index range scan regardless of its depth. One extra
+    row is fetched to learn whether another page exists.
+    """
+    query = select(ProjectModel).options(*fields_options(fields)).where(*filter_conditions(filters, dialect))
+    created_key = ProjectModel.created_date
+    if dialect == "sqlite":
+        # SQLite keeps timestamps as text, with or without a fraction depending on
+        # who wrote them, so text order disagrees with the bound cursor value;
+        # julianday orders and compares them as instants (to the millisecond)
+        created_key = func.julianday(ProjectModel.created_date)
+    if cursor:
+        created_date, project_id = decode_cursor(cursor)
+        bound = literal(created_date, ProjectModel.created_date.type)
+        if dialect == "sqlite":
+            bound = func.julianday(bound)
+        query = query.where(tuple_(created_key, ProjectModel.id) < tuple_(bound, project_id))
+    return query.order_by(created_key.desc(), ProjectModel.id.desc()).limit(limit + 1)
+
+def split_page(projects: List[ProjectModel], limit: int) -> Tuple[List[ProjectModel], Optional[str]]:
+    if len(projects) > limit:
+        projects = projects[:limit]
+        return projects, encode_cursor(projects[-1])
+    return projects, None
+
+def facets_query(filters: Optional[ProjectFilter], dialect: str):
+    """All facet counts as one UNION ALL aggregate over the filtered set"""
+    filtered = (
+        select(ProjectModel.status, ProjectModel.category, ProjectModel.tags, ProjectModel.tech_stack)
+        .where(*filter_conditions(filters, dialect))
+        .cte("filtered")
+    )
+    parts = [
+        select(literal("total").label("facet"), literal("").label("value"), func.count().label("count"))
+        .select_from(filtered),
+        select(literal("status"), cast(filtered.c.status, String), func.count())
+        .where(filtered.c.status.isnot(None))
+        .group_by(filtered.c.status),
+        select(literal("category"), filtered.c.category, func.count())
+        .where(filtered.c.category.isnot(None))
+        .group_by(filtered.c.category),
+    ]
+    for name in FACET_ARRAY_COLUMNS:
+        elements = _json_array_elements(filtered.c[name], dialect)
+        parts.append(
+            select(literal(name), elements.c.value, func.count())
+            .select_from(filtered.join(elements, true()))
+            .group_by(elements.c.value)
+        )
+    return union_all(*parts)
+
+def facets_from_rows(rows) -> ProjectFacets:
+    facets: Dict[str, Dict[str, int]] = {"status": {}, "category": {}, "tags": {}, "tech_stack": {}}
+    total = 0
+    for facet, value, count in rows:
+        if facet == "total":
+            total = count
+        else:
+            facets[facet][value] = count
+    return ProjectFacets(total=total, **facets)
 
 def create_project(db: Session, project: ProjectCreate) -> ProjectSchema:
     db_project = ProjectModel(**project.model_dump())
@@ -12,13 +283,34 @@ def create_project(db: Session, project: ProjectCreate) -> ProjectSchema:
     return db_project
 
 def get_project(db: Session, project_id: str) -> ProjectSchema:
-    return db.query(ProjectModel).filter(ProjectModel.id == project_id).first()
+    return db.execute(project_query(project_id)).scalar_one_or_none()
+
+def get_projects(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    filters: Optional[ProjectFilter] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> List[ProjectSchema]:
+    return db.execute(projects_query(skip, limit, filters, dialect_name(db), fields)).scalars().all()
+
+def get_projects_page(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    filters: Optional[ProjectFilter] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Tuple[List[ProjectSchema], Optional[str]]:
+    """Return one page of projects after the given cursor and the cursor of the next page"""
+    projects = db.execute(projects_page_query(cursor, limit, filters, dialect_name(db), fields)).scalars().all()
+    return split_page(projects, limit)
 
-def get_projects(db: Session, skip: int = 0, limit: int = 100) -> List[ProjectSchema]:
-    return db.query(ProjectModel).offset(skip).limit(limit).all()
+def get_project_facets(db: Session, filters: Optional[ProjectFilter] = None) -> ProjectFacets:
+    """Count projects per status, category, tag and technology within the current filter"""
+    return facets_from_rows(db.execute(facets_query(filters, dialect_name(db))))
 
 def update_project(db: Session, project_id: str, project_update: ProjectCreate) -> ProjectSchema:
-    db_project = db.query(ProjectModel).filter(ProjectModel.id == project_id).first()
+    db_project = get_project(db, project_id)
     if not db_project:
         return None
     for key, value in project_update.model_dump(exclude_unset=True).items():
@@ -28,7 +320,7 @@ def update_project(db: Session, project_id: str, project_update: ProjectCreate)
     return db_project
 
 def delete_project(db: Session, project_id: str) -> bool:
-    db_project = db.query(ProjectModel).filter(ProjectModel.id == project_id).first()
+    db_project = get_project(db, project_id)
     if not db_project:
         return False
     db.delete(db_project)
@@ -0,0 +1,169 @@
+from datetime import datetime, timezone
+from sqlalchemy import select
+from typing import Dict, List, Optional
+import json
+import os
+import time
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.db.models import ImageBlob, Project
+from app.services.image_store import BLOB_ROOT
+from app.services.storage import StoredObject, get_storage
+
+# S3 accepts at most this many keys per DeleteObjects call
+DELETE_BATCH_SIZE = 1000
+
+def image_group(key: str) -> str:
+    """The unit an image is stored and deleted as.
+
+    Variants share a directory (images/{sha256}/{params}/ or the legacy
+    projects/{project_id}/{image_id}/), so a group is live when any of its
+    objects is referenced; any other key stands alone.
+    """
+    parts = key.split("/")
+    if len(parts) == 4:
+        return "/".join(parts[:3])
+    return key
+
+class ReconcileReport:
+    """Running totals of one reconciliation, also what the checkpoint file stores"""
+
+    def __init__(self, prefix: str = "", dry_run: bool = False, start_after: Optional[str] = None):
+        self.prefix = prefix
+        self.dry_run = dry_run
+        self.start_after = start_after
+        self.scanned = 0
+        self.live = 0
+        self.recent = 0
+        self.orphaned = 0
+        self.orphaned_bytes = 0
+        self.deleted = 0
+        self.finished = False
+
+    def to_dict(self) -> Dict:
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ReconcileReport":
+        report = cls()
+        vars(report).update((name, value) for name, value in data.items() if name in vars(report))
+        return report
+
+class StorageReconciler:
+    """Deletes stored objects no project or image blob points at.
+
+    The storage listing is streamed page by page in key order and only the
+    current page's image groups are checked against the database, with two
+    IN queries, so memory stays flat however large the bucket is. Groups
+    with any object newer than the grace period are skipped, since uploads
+    write their objects before the row referencing them is committed.
+    """
+
+    def __init__(
+        self,
+        storage=None,
+        grace_seconds: float = 24 * 3600,
+        dry_run: bool = False,
+        page_size: int = DELETE_BATCH_SIZE,
+        delete_batch_size: int = DELETE_BATCH_SIZE,
+        checkpoint_path: Optional[str] = None,
+    ):
+        self.storage = storage or get_storage()
+        self.grace_seconds = grace_seconds
+        self.dry_run = dry_run
+        self.page_size = page_size
+        self.delete_batch_size = delete_batch_size
+        self.checkpoint_path = checkpoint_path
+        self.base_url = settings.S3_BASE_URL
+
+    async def run(self, prefix: str = "") -> ReconcileReport:
+        """Reconcile every key under `prefix`, resuming from the checkpoint when one is unfinished"""
+        report = self._load_checkpoint(prefix) or ReconcileReport(prefix, self.dry_run)
+        cutoff = time.time() - self.grace_seconds
+        # The listing's last group may continue on the next page, so it waits for it
+        carried: List[StoredObject] = []
+        pending: List[str] = []
+        async for page in self.storage.iter_object_pages(prefix, report.start_after, self.page_size):
+            objects = carried + page
+            last_group = image_group(objects[-1].key)
+            split = len(objects)
+            while split > 0 and image_group(objects[split - 1].key) == last_group:
+                split -= 1
+            complete, carried = objects[:split], objects[split:]
+            if complete:
+                pending.extend(await self._orphans(complete, cutoff, report))
+                while len(pending) >= self.delete_batch_size:
+                    await self._delete(pending[:self.delete_batch_size], report)
+                    pending = pending[self.delete_batch_size:]
+                # Resuming after this key is only safe once its orphans are gone,
+                # so the page's remainder is flushed before every checkpoint
+                await self._delete(pending, report)
+                pending = []
+                report.start_after = complete[-1].key
+                self._save_checkpoint(report)
+        if carried:
+            await self._delete(await self._orphans(carried, cutoff, report), report)
+        report.finished = True
+        self._save_checkpoint(report)
+        return report
+
+    async def _orphans(self, objects: List[StoredObject], cutoff: float, report: ReconcileReport) -> List[str]:
+        """Keys of `objects` (whole groups, in key order) that nothing references"""
+        report.scanned += len(objects)
+        groups: Dict[str, List[StoredObject]] = {}
+        for stored in objects:
+            groups.setdefault(image_group(stored.key), []).append(stored)
+        live = await self._referenced_groups(list(groups), [stored.key for stored in objects])
+        orphans = []
+        for group, members in groups.items():
+            if group in live:
+                report.live += len(members)
+            elif any(stored.modified > cutoff for stored in members):
+                report.recent += len(members)
+            else:
+                report.orphaned += len(members)
+                report.orphaned_bytes += sum(stored.size for stored in members)
+                orphans.extend(stored.key for stored in members)
+        return orphans
+
+    async def _referenced_groups(self, groups: List[str], keys: List[str]) -> set:
+        """Groups the database still points at: a registered image blob or a project's image_url"""
+        blob_prefixes = [group for group in groups if group.startswith(BLOB_ROOT)]
+        urls = [f"{self.base_url}/{key}" for key in keys]
+        async with AsyncSessionLocal() as db:
+            live = set()
+            if blob_prefixes:
+                live.update(await db.scalars(select(ImageBlob.prefix).where(ImageBlob.prefix.in_(blob_prefixes))))
+            for url in await db.scalars(select(Project.image_url).where(Project.image_url.in_(urls))):
+                live.add(image_group(url[len(self.base_url) + 1:]))
+        return live
+
+    async def _delete(self, keys: List[str], report: ReconcileReport) -> None:
+        if not keys:
+            return
+        if self.dry_run:
+            for key in keys:
+                print(f"Storage reconcile: would delete {key}")
+            return
+        report.deleted += await self.storage.delete_keys(keys)
+        print(f"Storage reconcile: deleted {report.deleted} orphaned objects so far")
+
+    def _load_checkpoint(self, prefix: str) -> Optional[ReconcileReport]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path) as f:
+            report = ReconcileReport.from_dict(json.load(f))
+        # A dry run never deleted anything, so a real run must not resume from it
+        if report.finished or report.prefix != prefix or report.dry_run != self.dry_run:
+            return None
+        print(f"Storage reconcile: resuming after {report.start_after}")
+        return report
+
+    def _save_checkpoint(self, report: ReconcileReport) -> None:
+        if not self.checkpoint_path:
+            return
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({**report.to_dict(), "updated": datetime.now(timezone.utc).isoformat()}, f)
+        os.replace(temp_path, self.checkpoint_path)
@@ -1,11 +1,17 @@
+import asyncio
 import os
-import uuid
-from typing import Optional
+import shutil
+from itertools import islice
+from typing import AsyncIterator, Iterator, List, Optional
 from fastapi import HTTPException, UploadFile
-from PIL import Image
-import io
 
 from app.core.config import settings
+from app.services.metrics import Timer, image_stage_duration, observe_stages
+from app.services.storage import StoredObject
+from app.services.image_store import acquire_blob, blob_prefix_of, register_blob, release_blob
+from app.services.image_service import (
+    StoredImage, content_prefix, image_processor, read_image_upload, render_variants_timed, resize_image, stored_image, variant_filename
+)
 
 class MockS3Service:
     def __init__(self):
@@ -37,59 +43,56 @@ class MockS3Service:
     def resize_image(self, image_data: bytes, max_size: tuple = (1024, 1024)) -> bytes:
         """Resize image to maximum dimensions while maintaining aspect ratio"""
         try:
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Convert RGBA to RGB if necessary
-            if image.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                if image.mode == 'P':
-                    image = image.convert('RGBA')
-                background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-                image = background
-            
-            # Resize image
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            # Save to bytes
-            output = io.BytesIO()
-            image.save(output, format='JPEG', quality=85, optimize=True)
-            return output.getvalue()
+            return resize_image(image_data, max_size)
         except Exception as e:
             raise HTTPException(
                 status_code=422,
                 detail=f"Error processing image: {str(e)}"
             )
 
-    async def upload_image(self, file: UploadFile, project_id: Optional[str] = None) -> str:
-        """Upload image to local storage and return the mock URL"""
+    async def upload_image(self, file: UploadFile, project_id: Optional[str] = None) -> StoredImage:
+        """Upload every image variant to local storage and return their mock URLs"""
+        # Validate the image
+        self.validate_image(file)
+        
+        # Stream the upload in, enforcing size and real format as it arrives
+        file_content = await read_image_upload(file)
+        return await self.store_image(file_content, project_id, file.filename)
+
+    async def store_image(
+        self, file_content: bytes, project_id: Optional[str] = None, filename: Optional[str] = None
+    ) -> StoredImage:
+        """Render and save every variant of already-validated image bytes, reusing stored content"""
         try:
-            # Validate the image
-            self.validate_image(file)
-            
-            # Read file content
-            file_content = await file.read()
-            
-            # Resize image
-            resized_content = self.resize_image(file_content)
-            
-            # Generate unique filename
-            file_extension = file.filename.split('.')[-1] if file.filename else 'jpg'
-            unique_filename = f"{uuid.uuid4()}.{file_extension}"
+            # Variants share a content-addressed directory: images/{sha256}/{params}/{size}.{ext}
+            prefix = await asyncio.to_thread(
+                content_prefix, file_content, settings.IMAGE_VARIANT_SIZES, settings.IMAGE_VARIANT_FORMATS
+            )
+            existing = await acquire_blob(prefix)
+            if existing is not None:
+                print(f"Mock S3: Reusing stored image {prefix}")
+                return existing
             
-            # Create project directory if needed
-            project_dir = f"{self.base_dir}/projects/{project_id or 'temp'}"
-            os.makedirs(project_dir, exist_ok=True)
+            # Render all variants from one decode in the processing pool, off the event loop
+            rendered, timings = await image_processor.run(
+                render_variants_timed, file_content, settings.IMAGE_VARIANT_SIZES, settings.IMAGE_VARIANT_FORMATS
+            )
+            observe_stages(timings)
+            image_dir = f"{self.base_dir}/{prefix}"
+            os.makedirs(image_dir, exist_ok=True)
             
-            # Save file locally
-            file_path = f"{project_dir}/{unique_filename}"
-            with open(file_path, 'wb') as f:
-                f.write(resized_content)
+            # Save files locally, off the event loop
+            with Timer(image_stage_duration, stage="store"):
+                await self._write_variants(image_dir, rendered)
             
-            # Return the mock URL
-            mock_url = f"{self.base_url}/projects/{project_id or 'temp'}/{unique_filename}"
-            print(f"Mock S3: Uploaded image to {file_path}, URL: {mock_url}")
-            return mock_url
+            # Return the mock URLs
+            stored = stored_image(self.base_url, prefix, rendered)
+            print(f"Mock S3: Uploaded {len(rendered)} image variants to {image_dir}, URL: {stored.url}")
+            return await register_blob(prefix, stored, lambda: self._write_variants(image_dir, rendered, missing_only=True))
             
+        except HTTPException:
+            # Validation and processing errors keep their own status codes
+            raise
         except Exception as e:
             print(f"Mock S3 upload error: {str(e)}")
             raise HTTPException(
@@ -97,8 +100,107 @@ class MockS3Service:
                 detail=f"Failed to upload image: {str(e)}"
             )
 
-    def delete_image(self, image_url: str) -> bool:
-        """Delete image from local storage using the URL"""
+    async def _write_variants(self, image_dir: str, rendered, missing_only: bool = False) -> None:
+        await asyncio.gather(*(
+            asyncio.to_thread(self._write_file, f"{image_dir}/{variant_filename(size, image_format)}", content, missing_only)
+            for size, _, image_format, content in rendered
+        ))
+
+    @staticmethod
+    def _write_file(path: str, content: bytes, missing_only: bool = False) -> None:
+        if missing_only and os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+
+    async def delete_image(self, image_url: str) -> bool:
+        """Delete an image and all of its variants from local storage using the URL"""
+        delete_files = lambda: asyncio.to_thread(self._delete_image_sync, image_url)
+        if image_url.startswith(self.base_url):
+            prefix = blob_prefix_of(image_url.replace(f"{self.base_url}/", ""))
+            # Shared with another project: only the reference goes away
+            if prefix is not None:
+                return await release_blob(prefix, delete_files)
+        return await delete_files()
+
+    async def delete_images(self, image_urls: List[str]) -> int:
+        """Delete many images concurrently; returns how many were removed"""
+        results = await asyncio.gather(*(self.delete_image(url) for url in image_urls))
+        return sum(results)
+
+    async def iter_object_pages(
+        self, prefix: str = "", start_after: Optional[str] = None, page_size: int = 1000
+    ) -> AsyncIterator[List[StoredObject]]:
+        """Yield the stored files one page at a time, in the same key order S3 lists them"""
+        objects = self._walk("", prefix, start_after or "")
+        while True:
+            page = await asyncio.to_thread(lambda: list(islice(objects, page_size)))
+            if not page:
+                return
+            yield page
+
+    def _walk(self, directory: str, prefix: str, start_after: str) -> Iterator[StoredObject]:
+        # Sorting directories as "name/" makes a depth-first walk yield keys in
+        # plain string order, so start_after can skip whole subtrees
+        try:
+            with os.scandir(os.path.join(self.base_dir, directory)) as scanned:
+                entries = [(f"{directory}{entry.name}/" if entry.is_dir() else f"{directory}{entry.name}", entry) for entry in scanned]
+        except FileNotFoundError:
+            return
+        for key, entry in sorted(entries, key=lambda item: item[0]):
+            if not (key.startswith(prefix) or prefix.startswith(key)):
+                continue
+            if key.endswith("/"):
+                if key < start_after and not start_after.startswith(key):
+                    continue
+                yield from self._walk(key, prefix, start_after)
+            elif key > start_after:
+                stat = entry.stat()
+                yield StoredObject(key, stat.st_mtime, stat.st_size)
+
+    async def delete_keys(self, keys: List[str]) -> int:
+        """Delete stored files by key, pruning directories they leave empty; returns how many were removed"""
+        return await asyncio.to_thread(self._delete_keys_sync, keys)
+
+    def _delete_keys_sync(self, keys: List[str]) -> int:
+        deleted = 0
+        for key in keys:
+            try:
+                os.remove(os.path.join(self.base_dir, key))
+                deleted += 1
+            except FileNotFoundError:
+                continue
+            directory = os.path.dirname(key)
+            while directory:
+                try:
+                    os.rmdir(os.path.join(self.base_dir, directory))
+                except OSError:
+                    # Not empty (or already gone)
+                    break
+                directory = os.path.dirname(directory)
+        return deleted
+
+    async def read_object(self, key: str) -> Optional[bytes]:
+        """Read one stored object by key; None when it does not exist"""
+        return await asyncio.to_thread(self._read_file, key)
+
+    def shutdown(self) -> None:
+        pass
+
+    def _read_file(self, key: str) -> Optional[bytes]:
+        base_dir = os.path.realpath(self.base_dir)
+        file_path = os.path.realpath(os.path.join(base_dir, key))
+        # Keys come from request paths, so never follow one outside the storage directory
+        if not file_path.startswith(base_dir + os.sep):
+            return None
+        try:
+            with open(file_path, 'rb') as f:
+                return f.read()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return None
+
+    def _delete_image_sync(self, image_url: str) -> bool:
         try:
             # Extract path from URL
             if not image_url.startswith(self.base_url):
@@ -107,6 +209,17 @@ class MockS3Service:
             relative_path = image_url.replace(f"{self.base_url}/", "")
             file_path = f"{self.base_dir}/{relative_path}"
             
+            # Variant layouts: remove the whole images/{sha256}/{params}/ or
+            # legacy projects/{project_id}/{image_id}/ directory
+            if len(relative_path.split("/")) == 4:
+                image_dir = os.path.dirname(file_path)
+                if os.path.isdir(image_dir):
+                    shutil.rmtree(image_dir)
+                    print(f"Mock S3: Deleted image variants {image_dir}")
+                    return True
+                print(f"Mock S3: Directory not found {image_dir}")
+                return False
+            
             # Delete file if it exists
             if os.path.exists(file_path):
                 os.remove(file_path)
@@ -119,6 +232,3 @@ class MockS3Service:
         except Exception as e:
             print(f"Mock S3 delete error: {str(e)}")
             return False
-
-# Create a singleton instance
-mock_s3_service = MockS3Service()
\ No newline at end of file
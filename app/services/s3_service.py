@@ -1,17 +1,38 @@
+import asyncio
 import boto3
-import uuid
-from typing import Optional
+import io
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Dict, List, Optional
 from fastapi import HTTPException, UploadFile
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
-from PIL import Image
-import io
 
 from app.core.config import settings
+from app.services.metrics import Timer, image_stage_duration, observe_stages
+from app.services.storage import StoredObject
+from app.services.image_store import acquire_blob, blob_prefix_of, register_blob, release_blob
+from app.services.image_service import (
+    StoredImage, content_prefix, image_processor, read_image_upload, render_variants_timed, resize_image, stored_image, variant_content_type,
+    variant_filename
+)
+
+# S3 accepts at most this many keys per DeleteObjects call
+DELETE_BATCH_SIZE = 1000
 
 class S3Service:
     def __init__(self):
         self.s3_client = None
         self.bucket_name = settings.S3_BUCKET_NAME
+        # boto3 is blocking, so its calls run on a dedicated pool sized to the
+        # HTTP connection pool; the event loop only awaits them
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE,
+            max_concurrency=4,
+        )
         self._initialize_client()
     
     def _initialize_client(self):
@@ -25,7 +46,17 @@ class S3Service:
                 's3',
                 aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
                 aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_REGION
+                region_name=settings.AWS_REGION,
+                # Local S3-compatible stand-ins (MinIO, LocalStack, moto server)
+                endpoint_url=settings.S3_ENDPOINT_URL,
+                config=Config(
+                    max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                    connect_timeout=settings.S3_CONNECT_TIMEOUT,
+                    read_timeout=settings.S3_READ_TIMEOUT,
+                    # Exponential backoff with jitter on throttling and transient errors
+                    retries={"max_attempts": settings.S3_MAX_ATTEMPTS, "mode": "standard"},
+                    s3={"addressing_style": "path"} if settings.S3_ENDPOINT_URL else None,
+                )
             )
         except Exception as e:
             print(f"Warning: Failed to initialize S3 client: {str(e)}")
@@ -38,6 +69,95 @@ class S3Service:
                 detail="AWS S3 not configured. Please set AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY environment variables."
             )
 
+    async def _call(self, func, *args, **kwargs):
+        """Run a blocking boto3 call on the S3 I/O pool"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.S3_MAX_POOL_CONNECTIONS, thread_name_prefix="s3"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def put_object(self, key: str, body: bytes, content_type: str, metadata: Dict[str, str]) -> None:
+        """Upload one object; bodies above S3_MULTIPART_THRESHOLD go up as parallel multipart parts"""
+        await self._call(
+            self.s3_client.upload_fileobj,
+            io.BytesIO(body),
+            self.bucket_name,
+            key,
+            ExtraArgs={
+                "ContentType": content_type,
+                # Content-addressed keys never change what they point at
+                "CacheControl": "public, max-age=31536000, immutable",
+                "Metadata": metadata,
+            },
+            Config=self.transfer_config,
+        )
+
+    async def delete_keys(self, keys: List[str]) -> int:
+        """Delete keys in DeleteObjects batches of up to 1000, all batches concurrently"""
+        batches = [keys[i:i + DELETE_BATCH_SIZE] for i in range(0, len(keys), DELETE_BATCH_SIZE)]
+        responses = await asyncio.gather(*(
+            self._call(
+                self.s3_client.delete_objects,
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            for batch in batches
+        ))
+        failed = sum(len(response.get("Errors", [])) for response in responses)
+        if failed:
+            print(f"Warning: {failed} S3 objects could not be deleted")
+        return len(keys) - failed
+
+    async def list_keys(self, prefix: str) -> List[str]:
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        pages = await self._call(lambda: list(paginator.paginate(Bucket=self.bucket_name, Prefix=prefix)))
+        return [item["Key"] for page in pages for item in page.get("Contents", [])]
+
+    async def iter_object_pages(
+        self, prefix: str = "", start_after: Optional[str] = None, page_size: int = DELETE_BATCH_SIZE
+    ) -> AsyncIterator[List[StoredObject]]:
+        """Yield the bucket listing one ListObjectsV2 page at a time, in key order"""
+        self._ensure_s3_client()
+        kwargs = {"Bucket": self.bucket_name, "Prefix": prefix, "MaxKeys": page_size}
+        if start_after:
+            kwargs["StartAfter"] = start_after
+        while True:
+            response = await self._call(self.s3_client.list_objects_v2, **kwargs)
+            objects = [
+                StoredObject(item["Key"], item["LastModified"].timestamp(), item["Size"])
+                for item in response.get("Contents", [])
+            ]
+            if objects:
+                yield objects
+            if not response.get("IsTruncated"):
+                return
+            kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+    async def read_object(self, key: str) -> Optional[bytes]:
+        """Download one object by key; None when it does not exist"""
+        self._ensure_s3_client()
+        try:
+            return await self._call(self._get_object_body, key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise HTTPException(
+                status_code=502,
+                detail=f"Failed to read image from S3: {str(e)}"
+            )
+
+    def _get_object_body(self, key: str) -> bytes:
+        # Reading the body is blocking network I/O too, so it stays on the S3 pool
+        return self.s3_client.get_object(Bucket=self.bucket_name, Key=key)["Body"].read()
+
+    def shutdown(self) -> None:
+        """Wait for in-flight S3 calls and release the I/O pool; called from the app lifespan"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
     def validate_image(self, file: UploadFile) -> None:
         """Validate uploaded image file"""
         # Check file size
@@ -57,64 +177,75 @@ class S3Service:
     def resize_image(self, image_data: bytes, max_size: tuple = (1024, 1024)) -> bytes:
         """Resize image to maximum dimensions while maintaining aspect ratio"""
         try:
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Convert RGBA to RGB if necessary
-            if image.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                if image.mode == 'P':
-                    image = image.convert('RGBA')
-                background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-                image = background
-            
-            # Resize image
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            # Save to bytes
-            output = io.BytesIO()
-            image.save(output, format='JPEG', quality=85, optimize=True)
-            return output.getvalue()
+            return resize_image(image_data, max_size)
         except Exception as e:
             raise HTTPException(
                 status_code=422,
                 detail=f"Error processing image: {str(e)}"
             )
 
-    async def upload_image(self, file: UploadFile, project_id: Optional[str] = None) -> str:
-        """Upload image to S3 and return the URL"""
+    async def upload_image(self, file: UploadFile, project_id: Optional[str] = None) -> StoredImage:
+        """Upload every image variant to S3 and return their URLs"""
+        # Ensure S3 client is available
+        self._ensure_s3_client()
+        
+        # Validate the image
+        self.validate_image(file)
+        
+        # Stream the upload in, enforcing size and real format as it arrives
+        file_content = await read_image_upload(file)
+        return await self.store_image(file_content, project_id, file.filename)
+
+    async def store_image(
+        self, file_content: bytes, project_id: Optional[str] = None, filename: Optional[str] = None
+    ) -> StoredImage:
+        """Render and upload every variant of already-validated image bytes.
+
+        Keys are derived from the content, so a source that was stored before
+        (by any project) is only referenced again, never reprocessed.
+        """
         try:
             # Ensure S3 client is available
             self._ensure_s3_client()
             
-            # Validate the image
-            self.validate_image(file)
-            
-            # Read file content
-            file_content = await file.read()
+            # Variants share a content-addressed prefix: images/{sha256}/{params}/{size}.{ext}
+            prefix = await asyncio.to_thread(
+                content_prefix, file_content, settings.IMAGE_VARIANT_SIZES, settings.IMAGE_VARIANT_FORMATS
+            )
+            existing = await acquire_blob(prefix)
+            if existing is not None:
+                return existing
             
-            # Resize image
-            resized_content = self.resize_image(file_content)
+            # Render all variants from one decode in the processing pool, off the event loop
+            rendered, timings = await image_processor.run(
+                render_variants_timed, file_content, settings.IMAGE_VARIANT_SIZES, settings.IMAGE_VARIANT_FORMATS
+            )
+            observe_stages(timings)
             
-            # Generate unique filename
-            file_extension = file.filename.split('.')[-1] if file.filename else 'jpg'
-            unique_filename = f"projects/{project_id or 'temp'}/{uuid.uuid4()}.{file_extension}"
+            # Upload all variants to S3 concurrently
+            metadata = {
+                'original_filename': filename or 'unknown',
+            }
+            with Timer(image_stage_duration, stage="store"):
+                await asyncio.gather(*(
+                    self.put_object(
+                        f"{prefix}/{variant_filename(size, image_format)}",
+                        content,
+                        variant_content_type(image_format),
+                        metadata,
+                    )
+                    for size, _, image_format, content in rendered
+                ))
             
-            # Upload to S3
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=unique_filename,
-                Body=resized_content,
-                ContentType='image/jpeg',
-                CacheControl='max-age=31536000',  # 1 year cache
-                Metadata={
-                    'original_filename': file.filename or 'unknown',
-                    'project_id': project_id or 'temp'
-                }
+            # Return the S3 URLs
+            return await register_blob(
+                prefix, stored_image(settings.S3_BASE_URL, prefix, rendered),
+                lambda: self._restore_variants(prefix, rendered, metadata),
             )
             
-            # Return the S3 URL
-            return f"{settings.S3_BASE_URL}/{unique_filename}"
-            
+        except HTTPException:
+            # Validation and processing errors keep their own status codes
+            raise
         except ClientError as e:
             raise HTTPException(
                 status_code=500,
@@ -131,8 +262,47 @@ class S3Service:
                 detail=f"Unexpected error during upload: {str(e)}"
             )
 
-    def delete_image(self, image_url: str) -> bool:
-        """Delete image from S3 using the URL"""
+    def _key_from_url(self, image_url: str) -> Optional[str]:
+        if not image_url.startswith(settings.S3_BASE_URL):
+            return None
+        return image_url.replace(f"{settings.S3_BASE_URL}/", "")
+
+    async def _restore_variants(self, prefix: str, rendered, metadata: Dict[str, str]) -> None:
+        """Upload again any variant a concurrent release deleted before our blob row landed"""
+        present = set(await self.list_keys(f"{prefix}/"))
+        variants = [
+            (f"{prefix}/{variant_filename(size, image_format)}", image_format, content)
+            for size, _, image_format, content in rendered
+        ]
+        await asyncio.gather(*(
+            self.put_object(key, content, variant_content_type(image_format), metadata)
+            for key, image_format, content in variants
+            if key not in present
+        ))
+
+    async def _image_keys(self, key: str) -> List[str]:
+        # Variant layouts: every object under images/{sha256}/{params}/ or
+        # the legacy projects/{project_id}/{image_id}/
+        if len(key.split("/")) == 4:
+            return await self.list_keys(key.rsplit("/", 1)[0] + "/")
+        return [key]
+
+    async def _delete_image_keys(self, key: str) -> bool:
+        keys = await self._image_keys(key)
+        return bool(keys) and await self.delete_keys(keys) == len(keys)
+
+    async def _release(self, key: str) -> bool:
+        """Delete the image behind a key; a content-addressed one only once its last reference goes.
+
+        Legacy keys are always owned by the one project pointing at them.
+        """
+        prefix = blob_prefix_of(key)
+        if prefix is None:
+            return await self._delete_image_keys(key)
+        return await release_blob(prefix, lambda: self._delete_image_keys(key))
+
+    async def delete_image(self, image_url: str) -> bool:
+        """Delete an image and all of its variants from S3 using the URL"""
         try:
             # Check if S3 is configured
             if not self.s3_client:
@@ -140,17 +310,12 @@ class S3Service:
                 return False
             
             # Extract key from URL
-            if not image_url.startswith(settings.S3_BASE_URL):
+            key = self._key_from_url(image_url)
+            if key is None:
                 return False
             
-            key = image_url.replace(f"{settings.S3_BASE_URL}/", "")
-            
-            # Delete from S3
-            self.s3_client.delete_object(
-                Bucket=self.bucket_name,
-                Key=key
-            )
-            return True
+            # Shared with another project: only the reference goes away
+            return await self._release(key)
             
         except ClientError as e:
             print(f"Error deleting image from S3: {str(e)}")
@@ -159,5 +324,19 @@ class S3Service:
             print(f"Unexpected error deleting image: {str(e)}")
             return False
 
-# Create a singleton instance
-s3_service = S3Service()
\ No newline at end of file
+    async def delete_images(self, image_urls: List[str]) -> int:
+        """Delete many images and their variants with batched, concurrent requests"""
+        if not self.s3_client:
+            print("Warning: S3 not configured, cannot delete images")
+            return 0
+        try:
+            keys = [key for key in map(self._key_from_url, image_urls) if key is not None]
+            # Legacy images are deleted in shared batches; blobs one at a time under their row lock
+            legacy = [key for key in keys if blob_prefix_of(key) is None]
+            key_lists = await asyncio.gather(*(self._image_keys(key) for key in legacy))
+            deleted = await self.delete_keys([key for key_list in key_lists for key in key_list])
+            released = await asyncio.gather(*(self._release(key) for key in keys if blob_prefix_of(key) is not None))
+            return deleted + sum(released)
+        except Exception as e:
+            print(f"Unexpected error deleting images: {str(e)}")
+            return 0
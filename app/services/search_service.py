@@ -0,0 +1,216 @@
+from sqlalchemy import event, func, inspect, literal_column, select
+from sqlalchemy.orm import Session, object_session, undefer_group
+from typing import Dict, List, Optional, Set, Tuple
+import math
+import re
+import threading
+import uuid
+
+from app.db.models import DETAIL_GROUP, Project as ProjectModel
+from app.db.schemas import Project as ProjectSchema
+
+# Searchable columns and their relative weights, mirroring the A-D weights
+# of the Postgres search_vector column
+SEARCH_FIELDS = {
+    "title": 1.0,
+    "description": 0.4,
+    "detailed_description": 0.2,
+    "objectives": 0.1,
+    "challenges": 0.1,
+}
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+class InvertedIndex:
+    """In-process inverted index used when Postgres full-text search is unavailable.
+
+    Built lazily from the database on first search and kept current by ORM
+    flush events applied on commit, so it only costs a full scan once per process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._doc_terms: Dict[str, Set[str]] = {}
+        self._built = False
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def build(self, db: Session) -> None:
+        columns = [ProjectModel.id] + [getattr(ProjectModel, field) for field in SEARCH_FIELDS]
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            for row in db.query(*columns).yield_per(1000):
+                self._add(str(row[0]), dict(zip(SEARCH_FIELDS, row[1:])))
+            self._built = True
+
+    def invalidate(self) -> None:
+        """Drop the index so it is rebuilt on the next search"""
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._built = False
+
+    def index(self, project_id: str, fields: Dict[str, Optional[str]]) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(project_id)
+            self._add(project_id, fields)
+
+    def remove(self, project_id: str) -> None:
+        with self._lock:
+            if self._built:
+                self._remove(project_id)
+
+    def search(self, query: str) -> List[Tuple[str, float]]:
+        """Return (project_id, score) pairs matching every query term, best first"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in terms]
+            if not all(postings):
+                return []
+            total_docs = len(self._doc_terms)
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates &= posting.keys()
+            scores = []
+            for project_id in candidates:
+                score = sum(
+                    posting[project_id] * math.log(1 + total_docs / len(posting))
+                    for posting in postings
+                )
+                scores.append((project_id, score))
+        scores.sort(key=lambda item: (-item[1], item[0]))
+        return scores
+
+    def _add(self, project_id: str, fields: Dict[str, Optional[str]]) -> None:
+        weights: Dict[str, float] = {}
+        for field, weight in SEARCH_FIELDS.items():
+            for term in tokenize(fields.get(field)):
+                weights[term] = weights.get(term, 0.0) + weight
+        for term, weight in weights.items():
+            self._postings.setdefault(term, {})[project_id] = weight
+        self._doc_terms[project_id] = set(weights)
+
+    def _remove(self, project_id: str) -> None:
+        for term in self._doc_terms.pop(project_id, ()):
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(project_id, None)
+                if not posting:
+                    del self._postings[term]
+
+search_index = InvertedIndex()
+
+# session.info key of the index changes a transaction's flushes made. They are
+# applied once it commits and dropped if it rolls back, so the index never
+# shows rows the database does not have.
+PENDING_CHANGES = "search_index_changes"
+
+def _searchable_fields(project) -> Dict[str, Optional[str]]:
+    return {field: getattr(project, field) for field in SEARCH_FIELDS}
+
+def _defer(target, change: Tuple[str, Optional[Dict[str, Optional[str]]]]) -> None:
+    session = object_session(target)
+    if session is None:
+        _apply([change])
+    else:
+        session.info.setdefault(PENDING_CHANGES, []).append(change)
+
+def _apply(changes) -> None:
+    for project_id, fields in changes:
+        if fields is None:
+            search_index.remove(project_id)
+        else:
+            search_index.index(project_id, fields)
+
+@event.listens_for(ProjectModel, "after_update")
+def _reindex_project(mapper, connection, target):
+    # Updates that leave the searchable text alone (e.g. a new image) need no
+    # reindexing, and must not touch deferred columns that were never loaded
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in SEARCH_FIELDS):
+        _index_project(mapper, connection, target)
+
+@event.listens_for(ProjectModel, "after_insert")
+def _index_project(mapper, connection, target):
+    _defer(target, (str(target.id), _searchable_fields(target)))
+
+@event.listens_for(ProjectModel, "after_delete")
+def _unindex_project(mapper, connection, target):
+    _defer(target, (str(target.id), None))
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_changes(session):
+    _apply(session.info.pop(PENDING_CHANGES, ()))
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(PENDING_CHANGES, None)
+
+def index_projects(projects) -> None:
+    """Index rows written by bulk statements, which do not fire mapper events; call after commit"""
+    _apply((str(project.id), _searchable_fields(project)) for project in projects)
+
+def unindex_projects(project_ids) -> None:
+    for project_id in project_ids:
+        search_index.remove(str(project_id))
+
+def _search_match():
+    search_vector = literal_column("projects.search_vector")
+    return search_vector, search_vector.op("@@")
+
+def search_query(q: str, skip: int, limit: int):
+    """Ranked Postgres full-text page; count(*) OVER () reports the total hit count in the same round trip"""
+    search_vector, matches = _search_match()
+    ts_query = func.websearch_to_tsquery("english", q)
+    rank = func.ts_rank(search_vector, ts_query)
+    return (
+        select(ProjectModel, func.count().over().label("total"))
+        .options(undefer_group(DETAIL_GROUP))
+        .where(matches(ts_query))
+        .order_by(rank.desc(), ProjectModel.id)
+        .offset(skip)
+        .limit(limit)
+    )
+
+def search_count_query(q: str):
+    _, matches = _search_match()
+    return select(func.count(ProjectModel.id)).where(matches(func.websearch_to_tsquery("english", q)))
+
+def fallback_page_ids(db: Session, q: str, skip: int, limit: int) -> Tuple[int, List[uuid.UUID]]:
+    """Rank with the in-process index and return (total hits, ids of the requested page)"""
+    if not search_index.built:
+        search_index.build(db)
+    hits = search_index.search(q)
+    return len(hits), [uuid.UUID(project_id) for project_id, _ in hits[skip:skip + limit]]
+
+def order_by_ids(projects, page_ids: List[uuid.UUID]) -> List[ProjectSchema]:
+    by_id = {project.id: project for project in projects}
+    return [by_id[project_id] for project_id in page_ids if project_id in by_id]
+
+def search_projects(db: Session, q: str, skip: int = 0, limit: int = 20) -> Tuple[int, List[ProjectSchema]]:
+    """Rank projects matching `q` and return (total hits, requested page)"""
+    if db.get_bind().dialect.name == "postgresql":
+        rows = db.execute(search_query(q, skip, limit)).all()
+        if rows:
+            return rows[0].total, [row[0] for row in rows]
+        return (db.execute(search_count_query(q)).scalar() if skip else 0), []
+
+    total, page_ids = fallback_page_ids(db, q, skip, limit)
+    if not page_ids:
+        return total, []
+    projects = db.execute(
+        select(ProjectModel).where(ProjectModel.id.in_(page_ids)).options(undefer_group(DETAIL_GROUP))
+    ).scalars()
+    return total, order_by_ids(projects, page_ids)
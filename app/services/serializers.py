@@ -0,0 +1,85 @@
+from fastapi.responses import JSONResponse
+from functools import lru_cache
+from pydantic_core import to_json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.db.schemas import Project, ProjectSummary, image_srcset
+
+try:
+    import orjson
+except ImportError:
+    print("Warning: orjson is not installed. Falling back to pydantic-core for JSON encoding.")
+    orjson = None
+
+def dumps(value: Any) -> bytes:
+    """Encode to JSON bytes with orjson when installed, else pydantic-core's encoder"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return to_json(value)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with `dumps` instead of the standard library encoder"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+# Values that are never null in the API schema, whatever the row holds
+EMPTY_DEFAULTS: Dict[str, Callable[[], Any]] = {"tags": list, "tech_stack": list, "metrics": dict}
+
+# Fields computed from other columns rather than read from one
+COMPUTED_FIELDS: Dict[str, Callable[[Any], Any]] = {
+    "image_srcset": lambda row: image_srcset(row.image_variants),
+}
+
+class RowSerializer:
+    """Precompiled JSON encoder for trusted ORM rows.
+
+    Rows loaded from our own tables already satisfy the schema, so their
+    loaded values are read straight from the instance dict (skipping the
+    instrumented attribute descriptors) into plain dicts and encoded in one
+    call, without any pydantic validation.
+    """
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = tuple(fields)
+        self._fields: List[Tuple[str, Optional[Callable[[Any], Any]], Optional[Callable[[], Any]]]] = [
+            (name, COMPUTED_FIELDS.get(name), EMPTY_DEFAULTS.get(name)) for name in self.fields
+        ]
+
+    def to_dict(self, row) -> Dict[str, Any]:
+        loaded = row.__dict__
+        values = {}
+        for name, computed, empty in self._fields:
+            if computed is not None:
+                value = computed(row)
+            elif name in loaded:
+                value = loaded[name]
+            else:
+                # Not loaded yet (expired or deferred); let the ORM load it or raise
+                value = getattr(row, name)
+            if value is None and empty is not None:
+                value = empty()
+            values[name] = value
+        return values
+
+    def dumps(self, row) -> bytes:
+        return dumps(self.to_dict(row))
+
+    def dumps_many(self, rows: Iterable) -> bytes:
+        return dumps([self.to_dict(row) for row in rows])
+
+def _schema_fields(schema) -> Tuple[str, ...]:
+    # Same key order as the schema's own JSON output
+    return tuple(schema.model_fields) + tuple(schema.model_computed_fields)
+
+PROJECT_KEYS = _schema_fields(Project)
+SUMMARY_KEYS = _schema_fields(ProjectSummary)
+
+@lru_cache(maxsize=128)
+def project_serializer(fields: Optional[Tuple[str, ...]] = None) -> RowSerializer:
+    """Serializer for `fields` (None: the full Project); the summary fields keep ProjectSummary's key order"""
+    if fields is None:
+        return RowSerializer(PROJECT_KEYS)
+    if set(fields) == set(SUMMARY_KEYS):
+        return RowSerializer(SUMMARY_KEYS)
+    return RowSerializer(fields)
@@ -0,0 +1,37 @@
+from typing import NamedTuple
+import threading
+
+from app.core.config import settings
+
+class StoredObject(NamedTuple):
+    """One object from a storage listing"""
+    key: str
+    # Unix timestamp of the last write
+    modified: float
+    size: int
+
+_storage = None
+_lock = threading.Lock()
+
+def get_storage():
+    """The configured image storage service (local mock or S3), created on first use.
+
+    Each backend module is imported only here, so boto3 is never loaded when
+    the mock is in use and importing the API has no storage side effects.
+    """
+    global _storage
+    if _storage is None:
+        with _lock:
+            if _storage is None:
+                if settings.USE_MOCK_S3:
+                    from app.services.s3_mock import MockS3Service
+                    _storage = MockS3Service()
+                else:
+                    from app.services.s3_service import S3Service
+                    _storage = S3Service()
+    return _storage
+
+def shutdown_storage() -> None:
+    """Release the storage backend's thread pool, if one was ever created"""
+    if _storage is not None:
+        _storage.shutdown()
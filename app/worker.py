@@ -0,0 +1,30 @@
+"""Standalone background image worker.
+
+Run with `python -m app.worker` next to API processes started with
+IMAGE_JOBS_WORKER=false. It needs the same DATABASE_URL, storage settings
+and IMAGE_JOBS_STAGING_DIR (a shared volume) as the API.
+"""
+import asyncio
+
+from app.core.config import settings
+from app.db.migrate import migrate
+from app.services.image_job_service import image_job_worker
+from app.services.image_service import image_processor
+from app.services.storage import get_storage, shutdown_storage
+
+async def main():
+    get_storage()
+    print("Image job worker started")
+    try:
+        await image_job_worker.run()
+    finally:
+        image_processor.shutdown(wait=True)
+        shutdown_storage()
+
+if __name__ == "__main__":
+    if settings.DB_MIGRATE_ON_STARTUP:
+        migrate()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Image job worker stopped")
@@ -0,0 +1,98 @@
+"""
+Shared helpers for the benchmark scripts: latency summaries and baseline files.
+
+A baseline is the JSON document a benchmark prints. Saving one with
+`--output` and passing it back with `--baseline` on a later run compares
+every metric and exits non-zero when one regressed by more than
+`--tolerance` (a fraction, 0.2 = 20%). Any failed request (an `errors`
+count above zero) also makes the run exit non-zero.
+"""
+import json
+import platform
+import sys
+from typing import Dict, List, Optional, Sequence
+
+def percentile(sorted_samples: Sequence[float], fraction: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+def latency_summary(samples: List[float], elapsed: float) -> Dict:
+    """Throughput and p50/p95/p99 (milliseconds) of per-operation durations in seconds"""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "throughput_per_s": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+def environment() -> Dict:
+    return {"python": sys.version.split()[0], "platform": platform.platform(), "machine": platform.machine()}
+
+def write_results(results: Dict, path: Optional[str]) -> None:
+    text = json.dumps(results, indent=2)
+    print(text)
+    if path:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+
+def _flatten(value, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            flat.update(_flatten(item, f"{prefix}{key}."))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        flat[prefix[:-1]] = float(value)
+    return flat
+
+def regressions(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Metrics worse than the baseline by more than `tolerance`.
+
+    Throughput is better when higher; `_ms`/`_us`/`seconds` timings are better
+    when lower. Anything else (counts, sizes) is not compared.
+    """
+    current, previous = _flatten(results), _flatten(baseline)
+    found = []
+    for name, before in previous.items():
+        after = current.get(name)
+        if after is None or before <= 0:
+            continue
+        if name.endswith("throughput_per_s"):
+            change = (before - after) / before
+        elif name.endswith(("_ms", "_us", "seconds")):
+            change = (after - before) / before
+        else:
+            continue
+        if change > tolerance:
+            found.append(f"{name}: {before:g} -> {after:g} ({change:+.0%})")
+    return found
+
+def failed_requests(results: Dict) -> List[str]:
+    """Every `errors` count above zero; a run with failures is not a valid measurement"""
+    return [
+        f"{name}: {count:g}" for name, count in _flatten(results).items()
+        if name.split(".")[-1] == "errors" and count > 0
+    ]
+
+def check_baseline(results: Dict, baseline_path: Optional[str], tolerance: float) -> int:
+    """Print failed requests and regressions against a saved baseline; returns the process exit code"""
+    found = failed_requests(results)
+    for line in found:
+        print(f"ERRORS {line}", file=sys.stderr)
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressed = regressions(results, baseline, tolerance)
+        for line in regressed:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        found += regressed
+    return 1 if found else 0
+
+def add_baseline_arguments(parser) -> None:
+    parser.add_argument("--output", help="Write the results JSON to this file (a new baseline)")
+    parser.add_argument("--baseline", help="Compare against a previously saved results file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression as a fraction (default 0.2)")
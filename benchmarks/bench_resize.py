@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark image resizing across source sizes and formats.
+
+Times `resize_image` (single 1024px JPEG) and `render_variants` (every
+configured size and format from one decode) on synthetic photos-like
+sources, in-process and single-threaded, so numbers are per core.
+
+Usage:
+    python benchmarks/bench_resize.py
+    python benchmarks/bench_resize.py --sizes 640x480,4000x3000 --formats jpeg,png --repeat 20 --output resize.json
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# app.core.config is imported for the variant settings and needs no database
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from baseline import add_baseline_arguments, check_baseline, environment, latency_summary, write_results
+
+SAVE_OPTIONS = {
+    "jpeg": {"format": "JPEG", "quality": 90},
+    "png": {"format": "PNG"},
+    "webp": {"format": "WEBP", "quality": 90},
+    "gif": {"format": "GIF"},
+}
+
+def source_image(size, image_format: str, seed: int = 7) -> bytes:
+    """Gradient plus noise shapes, which compresses like a photo rather than a flat fill"""
+    from PIL import Image, ImageDraw
+
+    width, height = size
+    rng = random.Random(seed)
+    gradient = Image.linear_gradient("L").resize((width, height))
+    image = Image.merge("RGB", (gradient, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT), gradient.rotate(90)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(200):
+        x, y = rng.randrange(width), rng.randrange(height)
+        radius = rng.randrange(5, max(6, width // 10))
+        draw.ellipse((x, y, x + radius, y + radius), fill=(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    output = io.BytesIO()
+    image.save(output, **SAVE_OPTIONS[image_format])
+    return output.getvalue()
+
+def measure(func, repeat: int):
+    func()  # warm up
+    samples = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call_started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - call_started)
+    return samples, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="640x480,1920x1080,4000x3000")
+    parser.add_argument("--formats", default="jpeg,png,webp,gif")
+    parser.add_argument("--repeat", type=int, default=10)
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.services.image_service import render_variants, resize_image
+
+    results = {
+        "environment": environment(),
+        "variant_sizes": settings.IMAGE_VARIANT_SIZES,
+        "variant_formats": settings.IMAGE_VARIANT_FORMATS,
+        "resize_image": {},
+        "render_variants": {},
+    }
+    for size_text in args.sizes.split(","):
+        size = tuple(int(part) for part in size_text.split("x"))
+        for image_format in args.formats.split(","):
+            source = source_image(size, image_format)
+            name = f"{size_text}.{image_format}"
+            samples, elapsed = measure(lambda: resize_image(source), args.repeat)
+            results["resize_image"][name] = {**latency_summary(samples, elapsed), "source_bytes": len(source)}
+            samples, elapsed = measure(
+                lambda: render_variants(source, settings.IMAGE_VARIANT_SIZES, settings.IMAGE_VARIANT_FORMATS), args.repeat
+            )
+            results["render_variants"][name] = latency_summary(samples, elapsed)
+
+    write_results(results, args.output)
+    sys.exit(check_baseline(results, args.baseline, args.tolerance))
+
+if __name__ == "__main__":
+    main()
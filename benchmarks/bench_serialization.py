@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Measure the per-row cost of turning Project ORM rows into a JSON response body.
+
+Compares the paths a list response can take:
+  - fastapi:   response_model validation + jsonable_encoder + json.dumps
+  - pydantic:  TypeAdapter validate (from_attributes) + dump_json
+  - fast:      precompiled row serializer, encoded with orjson (if installed)
+  - fast_core: precompiled row serializer, encoded with pydantic-core's to_json
+
+Usage:
+    python benchmarks/bench_serialization.py --rows 1000 --repeat 20
+    python benchmarks/bench_serialization.py --summary
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def synthetic_rows(count: int):
+    from app.db.models import Project, ProjectStatus
+
+    created = datetime.datetime(2024, 1, 1, 12, 0, 0, 123456)
+    return [
+        Project(
+            id=uuid.uuid4(),
+            title=f"Project {i}",
+            description="Synthetic project used for serialization benchmarks. " * 3,
+            detailed_description="Long form description. " * 40,
+            category=f"category-{i % 12}",
+            status=ProjectStatus.Active,
+            tags=["benchmark", f"tag-{i % 50}"],
+            tech_stack=["python", f"tech-{i % 20}"],
+            image_url=f"https://cdn.example.com/images/{i}/1024.jpeg",
+            image_variants={
+                image_format: {str(size): f"https://cdn.example.com/images/{i}/{size}.{image_format}" for size in (160, 480, 1024)}
+                for image_format in ("jpeg", "webp")
+            },
+            metrics={"stars": i, "coverage": 0.87},
+            team_name="Platform",
+            objectives="Ship it. " * 20,
+            created_date=created,
+            updated_date=created,
+        )
+        for i in range(count)
+    ]
+
+def per_row_us(encode, rows, repeat: int) -> float:
+    encode(rows)  # warm up
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        encode(rows)
+        best = min(best, time.perf_counter() - started)
+    return round(best / len(rows) * 1e6, 2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--summary", action="store_true", help="Serialize the list summary instead of full projects")
+    args = parser.parse_args()
+
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from pydantic_core import to_json
+    from typing import List
+    from app.db.schemas import Project, ProjectSummary
+    from app.services import serializers
+    from app.services.project_service import SUMMARY_FIELDS
+
+    schema = ProjectSummary if args.summary else Project
+    fields = SUMMARY_FIELDS if args.summary else None
+    adapter = TypeAdapter(List[schema])
+    serializer = serializers.project_serializer(fields)
+    rows = synthetic_rows(args.rows)
+
+    def fastapi_path(rows):
+        return json.dumps(jsonable_encoder(adapter.validate_python(rows, from_attributes=True))).encode()
+
+    def pydantic_path(rows):
+        return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+    def fast_core_path(rows):
+        return to_json([serializer.to_dict(row) for row in rows])
+
+    results = {
+        "rows": args.rows,
+        "schema": schema.__name__,
+        "orjson": serializers.orjson is not None,
+        "per_row_us": {
+            "fastapi": per_row_us(fastapi_path, rows, args.repeat),
+            "pydantic": per_row_us(pydantic_path, rows, args.repeat),
+            "fast_core": per_row_us(fast_core_path, rows, args.repeat),
+        },
+    }
+    if serializers.orjson is not None:
+        results["per_row_us"]["fast"] = per_row_us(serializer.dumps_many, rows, args.repeat)
+    results["identical_output"] = pydantic_path(rows) == serializer.dumps_many(rows)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
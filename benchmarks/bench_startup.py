@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Measure API cold start: `import main` and time to first request.
+
+Each run is a fresh interpreter (so nothing is already imported or cached)
+that imports `main`, then runs the lifespan startup and serves `GET /`
+through an ASGI client. Reports the median and max of --runs, plus which
+heavy optional modules (boto3, Pillow) the import pulled in; none should be
+loaded by importing the app.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 20 --output startup.json
+    python benchmarks/bench_startup.py --baseline startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from baseline import add_baseline_arguments, check_baseline, environment, write_results
+
+HEAVY_MODULES = ("boto3", "botocore", "PIL", "PIL.Image")
+
+# Runs in the child interpreter; prints one JSON line
+PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+async def first_request():
+    import httpx
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/")
+            assert response.status_code == 200, response.status_code
+            return time.perf_counter()
+
+served = asyncio.run(first_request())
+print(json.dumps({"import": imported - started, "first_request": served - started, "loaded": loaded}))
+"""
+
+def run_once(env) -> dict:
+    code = f"HEAVY_MODULES = {HEAVY_MODULES!r}\n{PROBE}"
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def summary(samples) -> dict:
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Sync database URL (default: temporary SQLite file)")
+    parser.add_argument("--runs", type=int, default=10)
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["DATABASE_URL"] = args.url or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    env.setdefault("USE_MOCK_S3", "true")
+    # The in-process worker would start polling during the lifespan
+    env.setdefault("IMAGE_JOBS_WORKER", "false")
+
+    runs = [run_once(env) for _ in range(args.runs)]
+    results = {
+        "environment": environment(),
+        "runs": args.runs,
+        "import": summary([run["import"] for run in runs]),
+        "first_request": summary([run["first_request"] for run in runs]),
+        "heavy_modules_loaded_by_import": sorted({name for run in runs for name in run["loaded"]}),
+    }
+    write_results(results, args.output)
+    sys.exit(check_baseline(results, args.baseline, args.tolerance))
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,43 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
+import asyncio
 import os
 
 from app.api.endpoints.progects import router as projects_router
+from app.api.endpoints.image_jobs import router as image_jobs_router
+from app.api.endpoints.images import router as images_router
 from app.api.endpoints.admin import router as admin_router
-from app.db.database import Base, engine
+from app.api.endpoints.metrics import router as metrics_router
+from app.api.compression import CompressionMiddleware, compressed_cache
+from app.api.instrumentation import MetricsMiddleware
+from app.core.config import settings
+from app.db.database import async_engine, engine
+from app.db.migrate import migrate
+from app.services.image_job_service import image_job_worker
+from app.services.image_service import image_processor
+from app.services.metrics import instrument_queries
+from app.services.serializers import FastJSONResponse
+from app.services.storage import get_storage, shutdown_storage
 
-app = FastAPI(title="Projects Catalog API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.DB_MIGRATE_ON_STARTUP:
+        await asyncio.to_thread(migrate)
+    # Storage (and with it boto3 or the uploads directory) is set up here, not at import
+    os.makedirs(uploads_dir, exist_ok=True)
+    get_storage()
+    if settings.IMAGE_JOBS_WORKER:
+        image_job_worker.start()
+    yield
+    # Let in-flight image jobs and storage calls finish, then stop the worker pools
+    await image_job_worker.stop()
+    image_processor.shutdown(wait=True)
+    shutdown_storage()
+
+app = FastAPI(title="Projects Catalog API", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,17 +47,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-Base.metadata.create_all(bind=engine)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        excluded_paths=settings.COMPRESSION_EXCLUDED_PATHS,
+        cache=compressed_cache,
+    )
+
+if settings.METRICS_ENABLED:
+    # Outermost, so latency includes compression and every other middleware
+    app.add_middleware(MetricsMiddleware)
+    instrument_queries(engine)
+    instrument_queries(async_engine.sync_engine)
+    app.include_router(metrics_router, tags=["metrics"])
 
-# Create uploads directory for mock S3
+# Uploads directory for mock S3, created in the lifespan
 uploads_dir = "/app/uploads"
-os.makedirs(uploads_dir, exist_ok=True)
 
 # Mount static files for serving uploaded images
-app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
+app.mount("/uploads", StaticFiles(directory=uploads_dir, check_dir=False), name="uploads")
 
+# Before the projects router, whose /{project_id} routes would otherwise capture /jobs
+app.include_router(image_jobs_router, prefix="/projects/jobs", tags=["image jobs"])
 app.include_router(projects_router, prefix="/projects", tags=["projects"])
 app.include_router(admin_router, prefix="/admin", tags=["admin"])
+app.include_router(images_router, prefix="/images", tags=["images"])
 
 @app.get("/", response_class=JSONResponse)
 async def root():
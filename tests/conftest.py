@@ -0,0 +1,24 @@
+import os
+import sys
+import tempfile
+
+# The app reads its settings at import time, so point it at a throwaway SQLite file first
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ.setdefault("USE_MOCK_S3", "true")
+os.environ.setdefault("IMAGE_JOBS_WORKER", "false")
+os.environ.setdefault("IMAGE_WORKER_MODE", "thread")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.db.database import Base, engine
+from app.db.migrate import migrate
+
+@pytest.fixture
+def database():
+    """A freshly migrated, empty database"""
+    migrate()
+    yield engine
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
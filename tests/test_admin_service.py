@@ -0,0 +1,35 @@
+from fastapi.testclient import TestClient
+
+from app.db.database import SessionLocal
+from app.db.models import Admin
+from app.services.admin_service import admin_cache, is_active_admin
+from main import app
+
+def test_membership_cache_is_invalidated_on_commit_only(database):
+    admin_cache.clear()
+    with SessionLocal() as db:
+        assert not is_active_admin(db, "new-admin")
+
+        db.add(Admin(sso_id="new-admin"))
+        db.flush()
+        assert admin_cache.get("new-admin") == b"0"
+        db.rollback()
+        assert admin_cache.get("new-admin") == b"0"
+
+        db.add(Admin(sso_id="new-admin"))
+        db.flush()
+        assert admin_cache.get("new-admin") == b"0"
+        db.commit()
+        assert admin_cache.get("new-admin") is None
+        assert is_active_admin(db, "new-admin")
+
+def test_admin_cache_counters_are_exported(database):
+    admin_cache.clear()
+    with SessionLocal() as db:
+        is_active_admin(db, "someone")
+        is_active_admin(db, "someone")
+
+    body = TestClient(app).get("/metrics").text
+
+    assert 'cache_hits{cache="admins"}' in body
+    assert 'cache_entries{cache="admins"} 1' in body
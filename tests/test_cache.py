@@ -0,0 +1,61 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, update
+
+from app.api.endpoints import progects
+from app.db.models import Project
+from app.services import cache
+from app.services.cache import RedisCache, invalidate_project
+from main import app
+
+class UnreachableRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("redis is down")
+        return fail
+
+def test_redis_errors_never_look_like_a_generation(monkeypatch):
+    redis_cache = RedisCache(UnreachableRedis())
+    assert redis_cache.incr(cache.LIST_GENERATION_KEY) is None
+    assert redis_cache.counter(cache.LIST_GENERATION_KEY) is None
+
+    monkeypatch.setattr(cache, "response_cache", redis_cache)
+    assert cache.list_cache_key("fingerprint") is None
+
+def insert_project(database, title: str) -> uuid.UUID:
+    project_id = uuid.uuid4()
+    with database.begin() as connection:
+        connection.execute(insert(Project), [{"id": project_id, "title": title}])
+    return project_id
+
+def rename(database, project_id: uuid.UUID, title: str) -> None:
+    with database.begin() as connection:
+        connection.execute(update(Project).where(Project.id == project_id).values(title=title))
+    invalidate_project(project_id)
+
+def test_write_invalidates_the_cached_project(database):
+    project_id = insert_project(database, "Before")
+    client = TestClient(app)
+    assert client.get(f"/projects/{project_id}").json()["title"] == "Before"
+
+    rename(database, project_id, "After")
+
+    assert client.get(f"/projects/{project_id}").json()["title"] == "After"
+
+def test_write_during_a_miss_is_not_cached_over(database, monkeypatch):
+    project_id = insert_project(database, "Before")
+    read_project_row = progects.get_project
+
+    async def read_then_concurrent_write(db, requested_id):
+        project = await read_project_row(db, requested_id)
+        # Another request commits and invalidates while this one still holds the old row
+        rename(database, project_id, "After")
+        return project
+
+    monkeypatch.setattr(progects, "get_project", read_then_concurrent_write)
+    client = TestClient(app)
+    assert client.get(f"/projects/{project_id}").json()["title"] == "Before"
+    monkeypatch.setattr(progects, "get_project", read_project_row)
+
+    assert client.get(f"/projects/{project_id}").json()["title"] == "After"
@@ -0,0 +1,21 @@
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from app.api.compression import CompressionMiddleware
+from app.services.cache import LRUCache
+
+def test_cached_bodies_are_not_shared_across_urls_with_the_same_etag():
+    app = FastAPI()
+
+    @app.get("/letters/{letter}")
+    def letters(letter: str):
+        return PlainTextResponse(letter * 4096, headers={"ETag": '"same"'})
+
+    app.add_middleware(CompressionMiddleware, cache=LRUCache(max_entries=10, ttl=60))
+    client = TestClient(app)
+
+    for letter in ("a", "b", "a"):
+        response = client.get(f"/letters/{letter}", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.text == letter * 4096
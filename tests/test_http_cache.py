@@ -0,0 +1,13 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+def test_cursor_and_offset_listings_have_different_etags(database):
+    client = TestClient(app)
+    offset = client.get("/projects/", params={"limit": 5})
+    cursor = client.get("/projects/", params={"limit": 5, "cursor": ""})
+
+    assert offset.status_code == cursor.status_code == 200
+    assert offset.json() == []
+    assert cursor.json() == {"items": [], "next_cursor": None}
+    assert offset.headers["ETag"] != cursor.headers["ETag"]
@@ -0,0 +1,119 @@
+import asyncio
+import io
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+from sqlalchemy import insert, select, update
+
+from app.db.database import AsyncSessionLocal
+from app.db.models import ImageBlob, ImageJob, ImageJobStatus, Project
+from app.services import image_job_service
+from app.services.image_job_service import claim_image_job, enqueue_image_job, run_image_job
+from app.services.s3_mock import MockS3Service
+
+def jpeg() -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (64, 48), "green").save(output, format="JPEG")
+    return output.getvalue()
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    mock = MockS3Service()
+    mock.base_dir = str(tmp_path / "uploads")
+    monkeypatch.setattr(image_job_service, "get_storage", lambda: mock)
+    monkeypatch.setattr(image_job_service.settings, "IMAGE_JOBS_STAGING_DIR", str(tmp_path / "staging"))
+    monkeypatch.setattr(image_job_service.settings, "IMAGE_JOBS_RETRY_BASE_SECONDS", 0)
+    return mock
+
+def insert_project(database) -> uuid.UUID:
+    project_id = uuid.uuid4()
+    with database.begin() as connection:
+        connection.execute(insert(Project), [{"id": project_id, "title": "Project"}])
+    return project_id
+
+def row(database, model, row_id):
+    with database.connect() as connection:
+        return connection.execute(select(model).where(model.id == row_id)).first()
+
+async def enqueue(project_id, image_data: bytes, max_attempts: int = 5) -> uuid.UUID:
+    async with AsyncSessionLocal() as db:
+        job = await enqueue_image_job(db, str(project_id), image_data, "upload.jpg")
+        job.max_attempts = max_attempts
+        await db.commit()
+        return job.id
+
+async def claim_and_run() -> None:
+    async with AsyncSessionLocal() as db:
+        job_id = await claim_image_job(db)
+    assert job_id is not None
+    await run_image_job(job_id)
+
+def test_job_points_the_project_at_the_image_with_a_new_version(database, storage):
+    project_id = insert_project(database)
+    before = row(database, Project, project_id).updated_date
+
+    async def scenario():
+        job_id = await enqueue(project_id, jpeg())
+        await claim_and_run()
+        return job_id
+
+    job = row(database, ImageJob, asyncio.run(scenario()))
+    project = row(database, Project, project_id)
+    assert job.status == ImageJobStatus.succeeded
+    assert project.image_url == job.image_url
+    assert project.updated_date != before
+
+def test_retryable_failures_are_requeued_then_dead_lettered(database, storage, monkeypatch):
+    project_id = insert_project(database)
+
+    async def unavailable(*args):
+        raise HTTPException(status_code=503, detail="storage unavailable")
+    monkeypatch.setattr(storage, "store_image", unavailable)
+
+    async def scenario():
+        job_id = await enqueue(project_id, jpeg(), max_attempts=2)
+        await claim_and_run()
+        assert row(database, ImageJob, job_id).status == ImageJobStatus.queued
+        await claim_and_run()
+        return job_id
+
+    job = row(database, ImageJob, asyncio.run(scenario()))
+    assert job.status == ImageJobStatus.dead
+    assert job.attempts == 2
+    assert job.last_error == "storage unavailable"
+
+def test_undecodable_upload_is_dead_lettered_at_once(database, storage):
+    project_id = insert_project(database)
+
+    async def scenario():
+        job_id = await enqueue(project_id, b"not an image")
+        await claim_and_run()
+        return job_id
+
+    job = row(database, ImageJob, asyncio.run(scenario()))
+    assert job.status == ImageJobStatus.dead
+    assert job.attempts == 1
+
+def test_result_of_a_lost_lease_releases_its_reference(database, storage, monkeypatch):
+    project_id = insert_project(database)
+    store_image = storage.store_image
+
+    async def store_while_reclaimed(*args):
+        stored = await store_image(*args)
+        # The lease expired meanwhile and another worker claimed the job again
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(ImageJob).values(attempts=ImageJob.attempts + 1))
+            await db.commit()
+        return stored
+    monkeypatch.setattr(storage, "store_image", store_while_reclaimed)
+
+    async def scenario():
+        await enqueue(project_id, jpeg())
+        await claim_and_run()
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(ImageBlob))).all()
+
+    assert asyncio.run(scenario()) == []
+    assert row(database, Project, project_id).image_url is None
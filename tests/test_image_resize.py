@@ -0,0 +1,16 @@
+import pytest
+from fastapi import HTTPException
+
+from app.services.image_resize_service import ResizeRequest
+
+def test_content_addressed_keys_are_resizable():
+    resize = ResizeRequest("images/" + "a" * 64 + "/params/1024.jpeg", 320, "jpeg")
+
+    assert resize.etag.startswith('"r-')
+
+def test_legacy_project_keys_are_not_resizable():
+    # Their bytes can change under the same key, which an immutable ETag cannot follow
+    with pytest.raises(HTTPException) as raised:
+        ResizeRequest("projects/1/2/1024.jpeg", 320, "jpeg")
+
+    assert raised.value.status_code == 404
@@ -0,0 +1,27 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.image_service import ImageProcessor
+
+def test_timed_out_work_keeps_its_slot_until_it_finishes():
+    processor = ImageProcessor(mode="thread", workers=1, max_queue=1, timeout=0.05)
+
+    async def scenario():
+        with pytest.raises(HTTPException) as timed_out:
+            await processor.run(time.sleep, 0.3)
+        assert timed_out.value.status_code == 504
+        # The sleep is still running in the pool, so there is no room yet
+        with pytest.raises(HTTPException) as rejected:
+            await processor.run(time.sleep, 0)
+        assert rejected.value.status_code == 503
+        await asyncio.sleep(0.4)
+        assert processor.pending == 0
+        await processor.run(time.sleep, 0)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        processor.shutdown()
@@ -0,0 +1,71 @@
+import asyncio
+import io
+import os
+
+from PIL import Image
+from sqlalchemy import select
+
+from app.db.database import AsyncSessionLocal
+from app.db.models import ImageBlob
+from app.services.image_store import release_blob
+from app.services.s3_mock import MockS3Service
+
+def jpeg(color) -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(output, format="JPEG")
+    return output.getvalue()
+
+def mock_storage(tmp_path) -> MockS3Service:
+    storage = MockS3Service()
+    storage.base_dir = str(tmp_path)
+    return storage
+
+def files_of(storage: MockS3Service, url: str) -> list:
+    directory = os.path.dirname(f"{storage.base_dir}/{url[len(storage.base_url) + 1:]}")
+    return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+async def refcounts():
+    async with AsyncSessionLocal() as db:
+        return dict((await db.execute(select(ImageBlob.prefix, ImageBlob.refcount))).all())
+
+def test_same_bytes_share_one_blob_until_the_last_release(database, tmp_path):
+    storage = mock_storage(tmp_path)
+
+    async def scenario():
+        first = await storage.store_image(jpeg("red"))
+        second = await storage.store_image(jpeg("red"))
+        assert first.url == second.url
+        assert list((await refcounts()).values()) == [2]
+
+        assert await storage.delete_image(first.url)
+        assert files_of(storage, first.url)
+        assert list((await refcounts()).values()) == [1]
+
+        assert await storage.delete_image(second.url)
+        assert files_of(storage, first.url) == []
+        assert await refcounts() == {}
+
+    asyncio.run(scenario())
+
+def test_upload_during_the_last_release_keeps_its_objects(database, tmp_path):
+    storage = mock_storage(tmp_path)
+
+    async def scenario():
+        stored = await storage.store_image(jpeg("blue"))
+        prefix = next(iter(await refcounts()))
+        uploads = []
+
+        async def delete_files():
+            # Another project uploads the same bytes while the objects are being deleted
+            uploads.append(asyncio.ensure_future(storage.store_image(jpeg("blue"))))
+            await asyncio.sleep(0.2)
+            return await asyncio.to_thread(storage._delete_image_sync, stored.url)
+
+        await release_blob(prefix, delete_files)
+        again = await uploads[0]
+
+        assert again.url == stored.url
+        assert len(files_of(storage, again.url)) == sum(len(widths) for widths in again.variants.values())
+        assert await refcounts() == {prefix: 1}
+
+    asyncio.run(scenario())
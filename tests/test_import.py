@@ -0,0 +1,40 @@
+import json
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+
+from app.api.deps import is_admin
+from app.db.models import Project
+from main import app
+
+def import_lines(lines) -> dict:
+    app.dependency_overrides[is_admin] = lambda: True
+    try:
+        response = TestClient(app).post("/projects/import", content="\n".join(lines))
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    return response.json()
+
+def test_import_upserts_by_id_and_reports_bad_lines(database):
+    existing = uuid.uuid4()
+    with database.begin() as connection:
+        connection.execute(insert(Project), [{"id": existing, "title": "Old title"}])
+        before = connection.execute(select(Project.created_date, Project.updated_date)).one()
+
+    report = import_lines([
+        json.dumps({"id": str(existing), "title": "New title"}),
+        json.dumps({"title": "Brand new", "created_date": "2020-01-01T00:00:00"}),
+        json.dumps({"description": "no title"}),
+        "{not json",
+    ])
+
+    assert (report["created"], report["updated"], report["failed"]) == (1, 1, 2)
+    assert [error["line"] for error in report["errors"]] == [3, 4]
+    with database.connect() as connection:
+        rows = {row.title: row for row in connection.execute(select(Project))}
+    assert rows["New title"].created_date == before.created_date
+    # Versions come from the database clock, to the millisecond on SQLite
+    assert rows["New title"].updated_date != before.updated_date
+    assert rows["Brand new"].created_date.year == 2020
@@ -0,0 +1,19 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.metrics import Metric
+from main import app
+
+def test_metric_without_samples_fails_when_created():
+    class Incomplete(Metric):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "never renders")
+
+def test_response_and_compression_cache_counters_are_exported():
+    body = TestClient(app).get("/metrics").text
+
+    for cache in ("projects", "compressed", "admins"):
+        assert f'cache_hits{{cache="{cache}"}}' in body
+        assert f'cache_misses{{cache="{cache}"}}' in body
@@ -0,0 +1,20 @@
+from sqlalchemy import create_engine, inspect
+
+from app.db.migrate import migrate
+
+def test_migrate_upgrades_an_existing_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    with engine.begin() as connection:
+        # The projects table as created before image_variants and its indexes existed
+        connection.exec_driver_sql(
+            "CREATE TABLE projects (id CHAR(32) PRIMARY KEY, title VARCHAR(200) NOT NULL, category VARCHAR(100), "
+            "status VARCHAR(11), tags JSON, tech_stack JSON, created_date TIMESTAMP)"
+        )
+
+    migrate(engine)
+    migrate(engine)
+
+    columns = {column["name"] for column in inspect(engine).get_columns("projects")}
+    assert "image_variants" in columns
+    indexes = {index["name"] for index in inspect(engine).get_indexes("projects")}
+    assert {"ix_projects_created_date_id", "ix_projects_status", "ix_projects_category"} <= indexes
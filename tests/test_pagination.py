@@ -0,0 +1,29 @@
+import asyncio
+
+from sqlalchemy import insert
+
+from app.db.database import AsyncSessionLocal
+from app.db.models import Project
+from app.services.async_project_service import get_projects_page
+
+async def walk_pages(limit: int, max_pages: int):
+    """Every page's ids, following next_cursor from the first page"""
+    pages, cursor = [], ""
+    async with AsyncSessionLocal() as db:
+        while cursor is not None and len(pages) < max_pages:
+            projects, cursor = await get_projects_page(db, cursor, limit)
+            pages.append([project.id for project in projects])
+    return pages, cursor
+
+def test_cursor_walks_rows_created_in_the_same_second(database):
+    # CURRENT_TIMESTAMP stores whole seconds on SQLite, so every row ties on created_date
+    with database.begin() as connection:
+        connection.execute(insert(Project), [{"title": f"Project {n}"} for n in range(10)])
+
+    pages, cursor = asyncio.run(walk_pages(limit=3, max_pages=10))
+
+    assert cursor is None, "pagination did not terminate"
+    ids = [project_id for page in pages for project_id in page]
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+    assert len(ids) == len(set(ids)) == 10
+    assert ids == sorted(ids, reverse=True)
@@ -0,0 +1,76 @@
+import json
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+
+from app.api.deps import is_admin
+from app.db.models import Project
+from main import app
+
+IMAGE_URL = "http://localhost:8000/uploads/images/abc/def/1024.jpg"
+
+@pytest.fixture
+def admin_client(database):
+    app.dependency_overrides[is_admin] = lambda: True
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+def image_urls(database) -> dict:
+    with database.connect() as connection:
+        return {row.title: row.image_url for row in connection.execute(select(Project.title, Project.image_url))}
+
+def test_patch_cannot_replace_the_image(database, admin_client):
+    project_id = uuid.uuid4()
+    with database.begin() as connection:
+        connection.execute(insert(Project), [{"id": project_id, "title": "Project", "image_url": IMAGE_URL}])
+
+    response = admin_client.patch(
+        f"/projects/{project_id}", json={"title": "Renamed", "image_url": "http://elsewhere/x.jpg"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Renamed"
+    assert response.json()["image_url"] == IMAGE_URL
+
+def test_batch_update_changes_each_etag(database, admin_client):
+    project_ids = [uuid.uuid4(), uuid.uuid4()]
+    with database.begin() as connection:
+        connection.execute(insert(Project), [{"id": project_id, "title": "Project"} for project_id in project_ids])
+    before = [admin_client.get(f"/projects/{project_id}").headers["ETag"] for project_id in project_ids]
+
+    response = admin_client.patch(
+        "/projects/batch", json=[{"id": str(project_id), "title": "Renamed"} for project_id in project_ids]
+    )
+
+    assert response.status_code == 200
+    after = [admin_client.get(f"/projects/{project_id}").headers["ETag"] for project_id in project_ids]
+    assert all(old != new for old, new in zip(before, after))
+
+def test_json_bodies_cannot_point_at_stored_images(database, admin_client):
+    project_id = uuid.uuid4()
+    with database.begin() as connection:
+        connection.execute(insert(Project), [{"id": project_id, "title": "Existing", "image_url": IMAGE_URL}])
+    other = "http://localhost:8000/uploads/images/123/456/1024.jpg"
+
+    admin_client.post("/projects/batch", json=[
+        {"title": "Copied", "image_url": other}, {"title": "External", "image_url": "https://cdn.example/x.jpg"},
+    ])
+    admin_client.post("/projects/import", content="\n".join([
+        json.dumps({"title": "Imported", "image_url": other}),
+        json.dumps({"id": str(project_id), "title": "Existing", "image_url": other}),
+    ]))
+    admin_client.put(f"/projects/{project_id}", data={"project_data": json.dumps({"title": "Existing", "image_url": None})})
+
+    assert image_urls(database) == {
+        "Copied": None, "External": "https://cdn.example/x.jpg", "Imported": None, "Existing": IMAGE_URL,
+    }
+
+def test_offset_listing_clamps_limit(database, admin_client):
+    with database.begin() as connection:
+        connection.execute(insert(Project), [{"id": uuid.uuid4(), "title": f"Project {n}"} for n in range(3)])
+
+    assert len(admin_client.get("/projects/", params={"limit": 5000}).json()) == 3
+    assert admin_client.get("/projects/", params={"limit": 0}).json() == []
+    assert admin_client.get("/projects/", params={"limit": 5000, "cursor": ""}).status_code == 422
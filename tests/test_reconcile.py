@@ -0,0 +1,45 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services.reconcile_service import StorageReconciler
+from app.services.storage import StoredObject
+
+class InterruptedStorage:
+    """Lists orphaned temp/ keys in pages, failing after `fail_after` pages"""
+
+    def __init__(self, count: int, fail_after: int):
+        self.keys = [f"temp/{n:03d}.jpg" for n in range(count)]
+        self.fail_after = fail_after
+        self.deleted = []
+
+    async def iter_object_pages(self, prefix="", start_after=None, page_size=1000):
+        keys = [key for key in self.keys if start_after is None or key > start_after]
+        for page, start in enumerate(range(0, len(keys), page_size)):
+            if page == self.fail_after:
+                raise ConnectionError("listing interrupted")
+            yield [StoredObject(key, 0, 1) for key in keys[start:start + page_size]]
+
+    async def delete_keys(self, keys):
+        self.deleted.extend(keys)
+        return len(keys)
+
+def test_checkpoint_is_saved_after_every_page(database, tmp_path):
+    checkpoint = tmp_path / "reconcile.json"
+    storage = InterruptedStorage(count=10, fail_after=2)
+    # Delete batches larger than a page used to hold back every checkpoint
+    reconciler = StorageReconciler(storage, page_size=3, delete_batch_size=100, checkpoint_path=str(checkpoint))
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(reconciler.run())
+
+    saved = json.loads(checkpoint.read_text())
+    assert saved["start_after"] is not None
+    assert sorted(storage.deleted) == [key for key in storage.keys if key <= saved["start_after"]]
+    assert saved["deleted"] == len(storage.deleted)
+
+    storage.fail_after = None
+    report = asyncio.run(reconciler.run())
+    assert report.finished
+    assert sorted(storage.deleted) == storage.keys
@@ -0,0 +1,23 @@
+from app.db.database import SessionLocal
+from app.db.models import Project
+from app.services.search_service import search_index, search_projects
+
+def test_index_follows_commits_not_flushes(database):
+    search_index.invalidate()
+    with SessionLocal() as db:
+        assert search_projects(db, "zeppelin") == (0, [])
+
+        db.add(Project(title="Zeppelin tracker"))
+        db.flush()
+        db.rollback()
+        assert search_projects(db, "zeppelin")[0] == 0
+
+        project = Project(title="Zeppelin tracker")
+        db.add(project)
+        db.commit()
+        assert search_projects(db, "zeppelin")[0] == 1
+
+        db.delete(project)
+        db.flush()
+        db.rollback()
+        assert search_projects(db, "zeppelin")[0] == 1